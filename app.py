@@ -23,17 +23,38 @@ from change_operations.modify_operation import modify_dependencies
 from change_operations.move_operation import move_activity
 from change_operations.parallelize_operation import parallelize_activities
 from change_operations.condition_update import condition_update
+from generation_budget import GenerationBudget
+from variant_cache import VariantCache, set_default_cache
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'temp_uploads'
 app.config['FREEZER_RELATIVE_URLS'] = True # Enable relative URLs for static files
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Limits for the variant generation of a single change request
+app.config['VARIANT_TIMEOUT_SECONDS'] = 60
+app.config['VARIANT_MAX_COUNT'] = 5_000_000
+app.config['VARIANT_MAX_MEMORY_BYTES'] = 1024 * 1024 * 1024
+# On-disk cache of generated variants, shared by all processes serving the app
+app.config['VARIANT_CACHE_DIR'] = 'variant_cache'
+app.config['VARIANT_CACHE_MAX_BYTES'] = 512 * 1024 * 1024
 
 current_matrix = None
 original_matrix = None
 
 last_modified_matrix = None
 
+def variant_generation_budget():
+    """Creates the variant generation budget for one request from the app config."""
+    return GenerationBudget.from_limits(
+        timeout=app.config['VARIANT_TIMEOUT_SECONDS'],
+        max_variants=app.config['VARIANT_MAX_COUNT'],
+        max_memory_bytes=app.config['VARIANT_MAX_MEMORY_BYTES'],
+    )
+
+def configure_variant_cache():
+    """Creates the on-disk variant cache from the app config and uses it for all variant generation."""
+    set_default_cache(VariantCache(app.config['VARIANT_CACHE_DIR'], app.config['VARIANT_CACHE_MAX_BYTES']))
+
 def dependencies_are_equal(dep1, dep2):
     """Check if two dependencies are equal, treating INDEPENDENCE as equivalent to None."""
     is_independence_or_none_1 = dep1 is None or (hasattr(dep1, 'type') and dep1.type == TemporalType.INDEPENDENCE) or (hasattr(dep1, 'type') and dep1.type == ExistentialType.INDEPENDENCE)
@@ -310,10 +331,11 @@ def change_matrix():
     try:
         operation = request.form.get('operation')
         modified_matrix = None
+        budget = variant_generation_budget()
 
         if operation == 'delete':
             activity = request.form.get('activity')
-            modified_matrix = delete_activity(current_matrix, activity)
+            modified_matrix = delete_activity(current_matrix, activity, budget=budget)
         elif operation == 'insert':
             activity = request.form.get('activity')
             
@@ -342,14 +364,14 @@ def change_matrix():
                     
                     dependencies[(from_activity, to_activity)] = (temporal_dep, existential_dep)
             
-            modified_matrix = insert_activity(current_matrix, activity, dependencies)
+            modified_matrix = insert_activity(current_matrix, activity, dependencies, budget=budget)
         elif operation == 'swap':
             activity1 = request.form.get('activity1')
             activity2 = request.form.get('activity2')
-            modified_matrix = swap_activities(current_matrix, activity1, activity2)
+            modified_matrix = swap_activities(current_matrix, activity1, activity2, budget=budget)
         elif operation == 'skip':
             activity = request.form.get('activity_to_skip')
-            modified_matrix = skip_activity(current_matrix, activity)
+            modified_matrix = skip_activity(current_matrix, activity, budget=budget)
         elif operation == 'replace':
             old_activity = request.form.get('old_activity')
             new_activity = request.form.get('new_activity')
@@ -357,7 +379,7 @@ def change_matrix():
         elif operation == 'collapse':
             collapsed_activity = request.form.get('collapsed_activity')
             collapse_activities = request.form.get('collapse_activities').split(',')
-            modified_matrix = collapse_operation(current_matrix, collapsed_activity, collapse_activities)
+            modified_matrix = collapse_operation(current_matrix, collapsed_activity, collapse_activities, budget=budget)
         elif operation == 'de-collapse':
             collapsed_activity = request.form.get('collapsed_activity')
             
@@ -373,7 +395,7 @@ def change_matrix():
                 collapsed_matrix = parse_yaml_to_adjacency_matrix(filepath)
                 
                 os.remove(filepath)
-                modified_matrix = decollapse_operation(current_matrix, collapsed_activity, collapsed_matrix)
+                modified_matrix = decollapse_operation(current_matrix, collapsed_activity, collapsed_matrix, budget=budget)
             else:
                 return jsonify({"success": False, "error": "Invalid file type for collapsed matrix."})
         elif operation == 'modify':
@@ -431,14 +453,14 @@ def change_matrix():
                     
                     dependencies[(from_activity, to_activity)] = (temporal_dep, existential_dep)
             
-            modified_matrix = move_activity(current_matrix, activity, dependencies)
+            modified_matrix = move_activity(current_matrix, activity, dependencies, budget=budget)
         elif operation == 'parallelize':
             parallel_activities = set(request.form.get('parallel_activities').split(','))
-            modified_matrix = parallelize_activities(current_matrix, parallel_activities)
+            modified_matrix = parallelize_activities(current_matrix, parallel_activities, budget=budget)
         elif operation == 'condition_update':
             condition_activity = request.form.get('condition_activity')
             depending_activity = request.form.get('depending_activity')
-            modified_matrix = condition_update(current_matrix, condition_activity, depending_activity)
+            modified_matrix = condition_update(current_matrix, condition_activity, depending_activity, budget=budget)
 
         if modified_matrix:
             locks = []
@@ -661,4 +683,5 @@ def export_matrix():
         return jsonify({"success": False, "error": str(e)})
 
 if __name__ == "__main__":
+    configure_variant_cache()
     app.run(debug=True)
@@ -1,10 +1,11 @@
-from typing import List
+from typing import Collection, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import build_variant_set
 from variants_to_matrix import variants_to_matrix
 from dependencies import TemporalType
+from generation_budget import GenerationBudget
 
-def collapse_variant_level(matrix: AdjacencyMatrix, main_variants: List[List[str]], collapsed_activity: str, collapse_activities: List[str]) -> List[List[str]]:
+def collapse_variant_level(matrix: AdjacencyMatrix, main_variants: Collection[List[str]], collapsed_activity: str, collapse_activities: List[str]) -> List[List[str]]:
     """
     Adds the variants of collapsed activities at the correct position in the main_variants
     
@@ -42,7 +43,7 @@ def collapse_variant_level(matrix: AdjacencyMatrix, main_variants: List[List[str
         return perform_collapse_variant(main_variants, collapsed_activity, collapse_activities)
 
 
-def perform_collapse_variant(variants: List[List[str]], collapsed_activity: str, collapse_activities: List[str]) -> List[List[str]]: 
+def perform_collapse_variant(variants: Collection[List[str]], collapsed_activity: str, collapse_activities: List[str]) -> List[List[str]]: 
     """
     Performs the actual collapsing on the level of variants, by replacing the first occurence of an activity of the collapsed set 
     with the collapsed_activity and deleting all other activities of collapse_activities 
@@ -84,7 +85,7 @@ def perform_collapse_variant(variants: List[List[str]], collapsed_activity: str,
                 
     return modified_variants
 
-def get_unique_elements_between_collapse_activities(variants: List[List[str]], collapse_activities: List[str]) -> List[str]:
+def get_unique_elements_between_collapse_activities(variants: Collection[List[str]], collapse_activities: List[str]) -> List[str]:
     """
     Extracts all unique elements that occur between any two collapse activities across multiple variants.
     
@@ -112,7 +113,7 @@ def get_unique_elements_between_collapse_activities(variants: List[List[str]], c
     
     return elements_in_between
 
-def collapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, collapse_activities: List[str]) -> AdjacencyMatrix:
+def collapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, collapse_activities: List[str], budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Collapse a set of activities 
     1. Checks
@@ -123,12 +124,14 @@ def collapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, co
         main_matrix: The input adjacency matrix
         collapsed_activity: The name of the activity which should replace collapsed activities 
         collapse_activities: Set of activities which should be collapsed 
+        budget: Limits for generating the acceptance variants
         
     Returns:
         A new adjacency matrix with the activities collapsed 
         
     Raises:
         ValueError: If activity not found
+        BudgetExceeded: If generating the variants exceeds the budget
     """
 
     # check that new activity is not already in matrix 
@@ -136,7 +139,7 @@ def collapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, co
         raise ValueError(f"Activity {collapsed_activity} already in matrix")
         
     # Generate variants from input matrix
-    variants = generate_acceptance_variants(main_matrix)
+    variants = build_variant_set(main_matrix, budget)
     
     # Remove activity from variants
     modified_variants = collapse_variant_level(main_matrix, variants, collapsed_activity, collapse_activities)
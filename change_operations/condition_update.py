@@ -1,9 +1,10 @@
-from typing import List
+from typing import Iterable, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import iter_acceptance_variants
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def condition_update_in_variants(variants: List[List[str]], condition_activity: str, depending_activity: str) -> List[List[str]]:
+def condition_update_in_variants(variants: Iterable[List[str]], condition_activity: str, depending_activity: str) -> List[List[str]]:
     """
     Makes an activity in variants depending on other activity
     
@@ -37,7 +38,7 @@ def condition_update_in_variants(variants: List[List[str]], condition_activity:
     return modified_variants
 
 
-def condition_update(matrix: AdjacencyMatrix, condition_activity: str, depending_activity: str) -> AdjacencyMatrix:
+def condition_update(matrix: AdjacencyMatrix, condition_activity: str, depending_activity: str, budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Makes an activity in the process dependending on another activity:
     1. Checking if the condition_activity is part of the variant 
@@ -47,12 +48,14 @@ def condition_update(matrix: AdjacencyMatrix, condition_activity: str, depending
         matrix: The input adjacency matrix
         condition_activity: The name of the activity which implices the other activity 
         depending_activity: The name of the activity which's occurence dependens on the condition activity 
+        budget: Limits for generating the acceptance variants
         
     Returns:
         A new adjacency matrix with the activity skipped
         
     Raises:
         ValueError: If activity not found
+        BudgetExceeded: If generating the variants exceeds the budget
     """
     if condition_activity not in matrix.activities:
         raise ValueError(f"Activity {condition_activity} not found in matrix")
@@ -60,8 +63,8 @@ def condition_update(matrix: AdjacencyMatrix, condition_activity: str, depending
     if depending_activity not in matrix.activities:
         raise ValueError(f"Activity {depending_activity} not found in matrix")
         
-    # Generate variants from input matrix
-    variants = generate_acceptance_variants(matrix)
+    # Stream variants from input matrix
+    variants = iter_acceptance_variants(matrix, budget, factored=True)
     
     # Remove activity from variants
     modified_variants = condition_update_in_variants(variants, condition_activity, depending_activity)
@@ -1,9 +1,10 @@
-from typing import List
+from typing import Collection, Iterable, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import build_variant_set, iter_acceptance_variants
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def decollapse_variant_level(main_variants: List[List[str]], collapsed_activity: str, collapsed_variants: List[List[str]]) -> List[List[str]]:
+def decollapse_variant_level(main_variants: Iterable[List[str]], collapsed_activity: str, collapsed_variants: Collection[List[str]]) -> List[List[str]]:
     """
     Adds the variants of collapsed activities at the correct position in the main_variants
     
@@ -41,7 +42,7 @@ def decollapse_variant_level(main_variants: List[List[str]], collapsed_activity:
     return modified_variants
 
 
-def decollapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, collapsed_matrix: AdjacencyMatrix) -> AdjacencyMatrix:
+def decollapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str, collapsed_matrix: AdjacencyMatrix, budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Decollapses an activity which is currently collapsed 
     1. Checking that collapsed activity is part of the process 
@@ -53,12 +54,14 @@ def decollapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str,
         main_matrix: The input adjacency matrix
         collapsed_activity: The name of the activity which is currently collapsed and should be de-collapsed 
         collapsed_matrix: The adjacency matrix of the activity which is currently collapsed 
+        budget: Limits for generating the acceptance variants of each matrix
         
     Returns:
         A new adjacency matrix with the activity decollapsed
         
     Raises:
         ValueError: If activity not found
+        BudgetExceeded: If generating the variants exceeds the budget
     """
 
     if collapsed_activity not in main_matrix.activities:
@@ -69,11 +72,11 @@ def decollapse_operation(main_matrix: AdjacencyMatrix, collapsed_activity: str,
         if activity in main_matrix.get_activities() and activity != collapsed_activity:
             raise ValueError(f"Activity {activity} is in matrix and collapsed matrix, activities would be defined ambigously after collapsing")
         
-    # Generate variants from input matrix
-    variants = generate_acceptance_variants(main_matrix)
+    # Stream variants from input matrix
+    variants = iter_acceptance_variants(main_matrix, budget, factored=True)
 
     # generate variants of collapsed process 
-    collapsed_variants = generate_acceptance_variants(collapsed_matrix)
+    collapsed_variants = build_variant_set(collapsed_matrix, budget)
     
     # Remove activity from variants
     modified_variants = decollapse_variant_level(variants, collapsed_activity, collapsed_variants)
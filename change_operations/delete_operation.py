@@ -1,9 +1,10 @@
-from typing import List
+from typing import Iterable, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import iter_acceptance_variants
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def delete_activity_from_variants(variants: List[List[str]], activity: str, remove_duplicates: bool = False) -> List[List[str]]:
+def delete_activity_from_variants(variants: Iterable[List[str]], activity: str, remove_duplicates: bool = False) -> List[List[str]]:
     """
     Removes the specified activity from all acceptance variants.
     
@@ -33,7 +34,7 @@ def delete_activity_from_variants(variants: List[List[str]], activity: str, remo
                 
     return modified_variants
 
-def delete_activity(matrix: AdjacencyMatrix, activity: str) -> AdjacencyMatrix:
+def delete_activity(matrix: AdjacencyMatrix, activity: str, budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Deletes an activity from the process by:
     1. Checking if deletion would result in an empty process due to equivalence relationships
@@ -44,18 +45,20 @@ def delete_activity(matrix: AdjacencyMatrix, activity: str) -> AdjacencyMatrix:
     Args:
         matrix: The input adjacency matrix
         activity: The name of the activity to delete
+        budget: Limits for generating the acceptance variants
         
     Returns:
         A new adjacency matrix with the activity removed
         
     Raises:
         ValueError: If activity not found or deletion would result in empty process
+        BudgetExceeded: If generating the variants exceeds the budget
     """
     if activity not in matrix.activities:
         raise ValueError(f"Activity {activity} not found in matrix")
         
-    # Generate variants from input matrix
-    variants = generate_acceptance_variants(matrix)
+    # Stream variants from input matrix
+    variants = iter_acceptance_variants(matrix, budget, factored=True)
 
     # Remove activity from variants
     modified_variants = delete_activity_from_variants(variants, activity)
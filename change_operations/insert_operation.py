@@ -1,4 +1,4 @@
-from typing import Tuple, Optional, Dict, List
+from typing import Tuple, Optional, Dict, Collection, List
 from dependencies import (
     TemporalDependency,
     ExistentialDependency,
@@ -9,10 +9,11 @@ from acceptance_variants import (
     satisfies_existential_constraints,
     satisfies_temporal_constraints,
 )
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import build_variant_set
 from utils.split_dependencies import split_dependencies
 from utils.check_valid_input import is_valid_input
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
 def search_valid_positions_to_insert(
     variant: List[str],
@@ -46,6 +47,7 @@ def insert_activity(
         Tuple[str, str],
         Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
     ],
+    budget: Optional[GenerationBudget] = None,
 ) -> AdjacencyMatrix:
     """
     Adds a new acivity to the process by:
@@ -57,15 +59,17 @@ def insert_activity(
         matrix: The input adjacency matrix
         activity: The name of the activity to insert
         dependencies: The dependencies defining the position of the activity to be inserted
+        budget: Limits for generating the acceptance variants
 
     Returns:
         A new adjacency matrix with the activity inserted
 
     Raises:
         ValueError: If input produces contradiction
+        BudgetExceeded: If generating the variants exceeds the budget
     """
     total_dependencies = matrix.get_dependencies() | dependencies
-    variants = generate_acceptance_variants(matrix)
+    variants = build_variant_set(matrix, budget)
     try:
         new_variants =  insert_into_variants(activity, dependencies, total_dependencies, matrix.get_activities(), variants)
     except ValueError as e:
@@ -83,7 +87,7 @@ def insert_into_variants(
         Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
     ],
     activities: List[str],
-    variants: List[List[str]]
+    variants: Collection[List[str]]
     )-> List[List[str]]:
     """
     Adds a new acivity to the process by:
@@ -1,4 +1,4 @@
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
 from itertools import chain, combinations, permutations
 from adjacency_matrix import AdjacencyMatrix
 from dependencies import (
@@ -9,6 +9,7 @@ from dependencies import (
     Direction,
 )
 from constraint_logic import check_temporal_relationship, check_existential_relationship
+from generation_budget import BudgetExceeded, GenerationBudget
 
 
 def _powerset(iterable):
@@ -193,7 +194,9 @@ def _format_contradiction_error(
 
 def modify_dependencies(
     matrix: AdjacencyMatrix,
-    modifications: List[Tuple[str, str, TemporalDependency, ExistentialDependency]]
+    modifications: List[Tuple[str, str, TemporalDependency, ExistentialDependency]],
+    budget: Optional[GenerationBudget] = None,
+    previous_variants: Optional[List[List[str]]] = None,
 ) -> Tuple[AdjacencyMatrix, List[Tuple[str, str]]]:
     """
     Modify multiple dependencies in the adjacency matrix using a variant-based algorithm.
@@ -212,6 +215,9 @@ def modify_dependencies(
         modifications: List of modifications, where each modification is a tuple:
                       (from_activity, to_activity, temporal_dependency, existential_dependency)
                       Note: temporal_direction is ignored (preserved from original or set to FORWARD)
+        budget: Limits for generating the acceptance variants
+        previous_variants: The acceptance variants of `matrix`, if known. They are then
+                      updated for the changed cells instead of generating all variants again.
 
     Returns:
         Tuple of (modified_matrix, changed_cells) where:
@@ -222,6 +228,7 @@ def modify_dependencies(
         ValueError: If any activity in modifications is not found in matrix
         ValueError: If modifications list is empty
         ValueError: If contradictions are detected (with detailed conflict information)
+        BudgetExceeded: If generating the variants exceeds the budget
     """
     if not modifications:
         raise ValueError("Modifications list cannot be empty")
@@ -283,8 +290,17 @@ def modify_dependencies(
     # STEP 2-6: Use optimized acceptance variant generation
     # This handles powersets, existential validation, permutations, and temporal validation
     try:
-        from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
-        acceptance_sequences = generate_acceptance_variants(modified_matrix)
+        if previous_variants is not None:
+            from incremental_variants import update_acceptance_variants
+            acceptance_sequences = update_acceptance_variants(
+                previous_variants, matrix, modified_matrix, budget=budget
+            )
+        else:
+            from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+            acceptance_sequences = generate_acceptance_variants(modified_matrix, budget=budget)
+    except BudgetExceeded:
+        # Running out of budget says nothing about contradictions
+        raise
     except Exception as e:
         # If variant generation fails, it means there are contradictions
         raise ValueError(f"Contradictions detected: modification cannot be implemented.\nAdditional modifications required beyond provided set.\n\nIssue: {str(e)}")
@@ -1,14 +1,15 @@
-from typing import Tuple, Optional, Dict, List
+from typing import Tuple, Optional, Dict, Iterable, List
 from dependencies import (
     TemporalDependency,
     ExistentialDependency,
     Direction,
 )
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import build_variant_set
 from variants_to_matrix import variants_to_matrix
 from change_operations.delete_operation import delete_activity_from_variants
 from change_operations.insert_operation import insert_into_variants
+from generation_budget import GenerationBudget
 
 def move_activity(
         matrix: AdjacencyMatrix,
@@ -17,6 +18,7 @@ def move_activity(
             Tuple[str, str],
             Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
         ],
+        budget: Optional[GenerationBudget] = None,
     ) -> AdjacencyMatrix:
     """
     Removes activity from original position and moves it to new position.
@@ -25,14 +27,16 @@ def move_activity(
         matrix: The input adjacency matrix
         activity: The name of the activity which should be moved
         dependencies: The dependencies defining the new position of the activity to be moved
+        budget: Limits for generating the acceptance variants
 
     Returns:
         A new adjacency matrix with the activity moved
 
     Raises:
         ValueError: If input produces contradiction
+        BudgetExceeded: If generating the variants exceeds the budget
     """
-    variants = generate_acceptance_variants(matrix)
+    variants = build_variant_set(matrix, budget)
     try:
         new_variants = move_activity_in_variants(activity, dependencies, variants)
     except ValueError as e:
@@ -85,7 +89,7 @@ def move_activity_in_variants(
             Tuple[str, str],
             Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
         ],
-        variants: List[List[str]],
+        variants: Iterable[List[str]],
     ) -> List[List[str]]:
     """
     Removes activity from original position and moves it to new position.
@@ -1,11 +1,12 @@
-from typing import List, Set, Tuple, Dict, Optional
+from typing import Collection, List, Set, Tuple, Dict, Optional
 from itertools import permutations
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import build_variant_set
 from adjacency_matrix import AdjacencyMatrix
 from dependencies import TemporalType, TemporalDependency, ExistentialDependency
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def get_unique_elements_between_parallel_activities(variants: List[List[str]], parallel_activities: Set[str]) -> List[str]:
+def get_unique_elements_between_parallel_activities(variants: Collection[List[str]], parallel_activities: Set[str]) -> List[str]:
     """
     Extracts all unique elements that occur between any two parallelized activities across multiple variants.
     
@@ -39,7 +40,7 @@ def check_valid_input(
             Tuple[str, str],
             Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
         ],
-        variants: List[List[str]]
+        variants: Collection[List[str]]
     ) -> bool:
     """
     Define set X = {x1, x2, …, xn} to be parallelized
@@ -83,7 +84,7 @@ def parallelize_activities_on_variants(
             Tuple[str, str],
             Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
         ], 
-        variants: List[List[str]]) -> List[List[str]]:
+        variants: Collection[List[str]]) -> List[List[str]]:
     """
     Parallelizes activities by:
     1. Checking if input is valid
@@ -130,7 +131,7 @@ def parallelize_activities_on_variants(
 
 
 
-def parallelize_activities(matrix: AdjacencyMatrix, parallel_activities: Set[str]):
+def parallelize_activities(matrix: AdjacencyMatrix, parallel_activities: Set[str], budget: Optional[GenerationBudget] = None):
     """
     Parallelizes activities in matrix:
     1. Generating variants for the input matrix.
@@ -140,14 +141,16 @@ def parallelize_activities(matrix: AdjacencyMatrix, parallel_activities: Set[str
     Args:
         matrix: The input adjacency matrix
         parallell_activities: The name of the activities to be paralellized
+        budget: Limits for generating the acceptance variants
 
     Returns:
         A new adjacency matrix with the activities parallelized
 
     Raises:
         ValueError: If input produces contradiction
+        BudgetExceeded: If generating the variants exceeds the budget
     """
-    variants = generate_acceptance_variants(matrix)
+    variants = build_variant_set(matrix, budget)
 
     try:
         new_variants = parallelize_activities_on_variants(parallel_activities, matrix.dependencies, variants)
@@ -1,9 +1,10 @@
-from typing import List
+from typing import Iterable, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import iter_acceptance_variants
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def skip_activity_in_variants(variants: List[List[str]], optional_activity: str) -> List[List[str]]:
+def skip_activity_in_variants(variants: Iterable[List[str]], optional_activity: str) -> List[List[str]]:
     """
     Removes the specified activity from all acceptance variants.
     
@@ -37,7 +38,7 @@ def skip_activity_in_variants(variants: List[List[str]], optional_activity: str)
     return modified_variants
 
 
-def skip_activity(matrix: AdjacencyMatrix, optional_activity: str) -> AdjacencyMatrix:
+def skip_activity(matrix: AdjacencyMatrix, optional_activity: str, budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Makes an activity in the process optional:
     1. Checking if the named activity is part ov the variant 
@@ -46,18 +47,20 @@ def skip_activity(matrix: AdjacencyMatrix, optional_activity: str) -> AdjacencyM
     Args:
         matrix: The input adjacency matrix
         activity: The name of the activity to become optional
+        budget: Limits for generating the acceptance variants
         
     Returns:
         A new adjacency matrix with the activity skipped
         
     Raises:
         ValueError: If activity not found
+        BudgetExceeded: If generating the variants exceeds the budget
     """
     if optional_activity not in matrix.activities:
         raise ValueError(f"Activity {optional_activity} not found in matrix")
         
-    # Generate variants from input matrix
-    variants = generate_acceptance_variants(matrix)
+    # Stream variants from input matrix
+    variants = iter_acceptance_variants(matrix, budget, factored=True)
     
     # Remove activity from variants
     modified_variants = skip_activity_in_variants(variants, optional_activity)
@@ -1,9 +1,10 @@
-from typing import List
+from typing import Iterable, List, Optional
 from adjacency_matrix import AdjacencyMatrix
-from optimized_acceptance_variants import generate_optimized_acceptance_variants as generate_acceptance_variants
+from optimized_acceptance_variants import iter_acceptance_variants
 from variants_to_matrix import variants_to_matrix
+from generation_budget import GenerationBudget
 
-def swap_activities_in_variants(variants: List[List[str]], activity1: str, activity2: str) -> List[List[str]]:
+def swap_activities_in_variants(variants: Iterable[List[str]], activity1: str, activity2: str) -> List[List[str]]:
     """
     Swaps two activities in all variants.
     """
@@ -20,7 +21,7 @@ def swap_activities_in_variants(variants: List[List[str]], activity1: str, activ
         swapped_variants.append(new_variant)
     return swapped_variants
 
-def swap_activities(matrix: AdjacencyMatrix, activity1: str, activity2: str) -> AdjacencyMatrix:
+def swap_activities(matrix: AdjacencyMatrix, activity1: str, activity2: str, budget: Optional[GenerationBudget] = None) -> AdjacencyMatrix:
     """
     Swaps two activities in the process model by regenerating variants and then the matrix.
     
@@ -28,18 +29,20 @@ def swap_activities(matrix: AdjacencyMatrix, activity1: str, activity2: str) ->
         matrix: The input adjacency matrix.
         activity1: The first activity to swap.
         activity2: The second activity to swap.
+        budget: Limits for generating the acceptance variants.
         
     Returns:
         A new adjacency matrix with the activities swapped.
         
     Raises:
         ValueError: If either activity is not found in the matrix.
+        BudgetExceeded: If generating the variants exceeds the budget.
     """
     if activity1 not in matrix.activities or activity2 not in matrix.activities:
         raise ValueError("One or both activities not found in the matrix")
 
-    # Generate acceptance variants from the original matrix
-    variants = generate_acceptance_variants(matrix)
+    # Stream acceptance variants from the original matrix
+    variants = iter_acceptance_variants(matrix, budget, factored=True)
     
     # Swap the activities in each variant
     modified_variants = swap_activities_in_variants(variants, activity1, activity2)
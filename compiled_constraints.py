@@ -0,0 +1,294 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from dependencies import (
+    TemporalType,
+    ExistentialType,
+    Direction,
+)
+from adjacency_matrix import AdjacencyMatrix
+from constraint_logic import check_existential_relationship
+
+
+@dataclass(frozen=True)
+class CompiledConstraints:
+    """
+    Bitmask form of the constraints of an adjacency matrix.
+
+    Activities are referred to by their index in `activities`, sets of activities
+    by integer bitmasks. The temporal masks follow the semantics of
+    constraint_logic.check_temporal_relationship: a BACKWARD dependency is stored
+    with source and target swapped, BOTH behaves like FORWARD.
+    - must_precede[i]: activities that must come before i whenever both are present
+    - must_follow[i]: activities that must not come before i whenever both are present
+    - direct_predecessor[i]: activities that must directly precede i whenever both are present
+    - direct_successor[i]: activities that must directly follow i whenever both are present
+    - existential: (source index, target index, type, direction) of every existential dependency
+    """
+
+    activities: Tuple[str, ...]
+    must_precede: Tuple[int, ...]
+    must_follow: Tuple[int, ...]
+    direct_predecessor: Tuple[int, ...]
+    direct_successor: Tuple[int, ...]
+    existential: Tuple[Tuple[int, int, ExistentialType, Direction], ...]
+
+    def satisfies_existential(self, subset_bitset: int) -> bool:
+        """Checks if a subset of activities satisfies all existential constraints."""
+        for src_idx, tgt_idx, dep_type, direction in self.existential:
+            if not check_existential_relationship(
+                (subset_bitset >> src_idx) & 1 == 1,
+                (subset_bitset >> tgt_idx) & 1 == 1,
+                dep_type,
+                direction,
+            ):
+                return False
+        return True
+
+    def fingerprint(self) -> str:
+        """
+        Hashes the constraints into a stable hex digest.
+
+        Matrices that compile to the same constraints over the same activity order
+        share a fingerprint, so it identifies their acceptance variants.
+        """
+        canonical = json.dumps([
+            list(self.activities),
+            list(self.must_precede),
+            list(self.must_follow),
+            list(self.direct_predecessor),
+            list(self.direct_successor),
+            sorted(
+                [src_idx, tgt_idx, dep_type.name, direction.name]
+                for src_idx, tgt_idx, dep_type, direction in self.existential
+            ),
+        ])
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compile_constraints(adj_matrix: AdjacencyMatrix) -> CompiledConstraints:
+    """
+    Compiles the dependencies of an adjacency matrix into a CompiledConstraints.
+    """
+    activities = tuple(adj_matrix.activities)
+    activity_to_idx = {activity: idx for idx, activity in enumerate(activities)}
+    n = len(activities)
+
+    must_precede = [0] * n
+    must_follow = [0] * n
+    direct_predecessor = [0] * n
+    direct_successor = [0] * n
+    existential = []
+
+    for (source, target), (temp_dep, exist_dep) in adj_matrix.dependencies.items():
+        src_idx = activity_to_idx[source]
+        tgt_idx = activity_to_idx[target]
+
+        if exist_dep and exist_dep.type != ExistentialType.INDEPENDENCE:
+            existential.append((src_idx, tgt_idx, exist_dep.type, exist_dep.direction))
+
+        # A temporal dependency of an activity on itself never constrains a variant
+        if not temp_dep or temp_dep.type == TemporalType.INDEPENDENCE or src_idx == tgt_idx:
+            continue
+
+        first, second = src_idx, tgt_idx
+        if temp_dep.direction == Direction.BACKWARD:
+            first, second = second, first
+
+        must_precede[second] |= 1 << first
+        must_follow[first] |= 1 << second
+        if temp_dep.type == TemporalType.DIRECT:
+            direct_predecessor[second] |= 1 << first
+            direct_successor[first] |= 1 << second
+
+    return CompiledConstraints(
+        activities=activities,
+        must_precede=tuple(must_precede),
+        must_follow=tuple(must_follow),
+        direct_predecessor=tuple(direct_predecessor),
+        direct_successor=tuple(direct_successor),
+        existential=tuple(existential),
+    )
+
+
+def contract_direct_chains(
+    compiled: CompiledConstraints, subset_bitset: int
+) -> Optional[List[Tuple[int, ...]]]:
+    """
+    Contracts the DIRECT dependencies within a subset into chains of forced adjacency.
+
+    Every activity of the subset belongs to exactly one chain; an activity without
+    direct dependencies inside the subset forms a chain of its own. A chain can only
+    appear as one contiguous block in any valid ordering of the subset.
+
+    Returns:
+        The chains ordered by the index of their first activity, or None if the
+        subset has no valid ordering because an activity would need two direct
+        successors or predecessors, the direct dependencies form a cycle, or an
+        eventual dependency contradicts the order within a chain
+    """
+    chains: List[Tuple[int, ...]] = []
+    covered = 0
+    remaining = subset_bitset
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        idx = bit.bit_length() - 1
+        if compiled.direct_predecessor[idx] & subset_bitset:
+            continue
+
+        chain = [idx]
+        chain_mask = bit
+        while True:
+            successor = compiled.direct_successor[chain[-1]] & subset_bitset
+            if not successor:
+                break
+            if successor & (successor - 1) or successor & chain_mask:
+                return None
+            successor_idx = successor.bit_length() - 1
+            if compiled.direct_predecessor[successor_idx] & subset_bitset != 1 << chain[-1]:
+                return None
+            chain.append(successor_idx)
+            chain_mask |= successor
+
+        # No member may be required to come before an earlier member of its chain
+        preceding = 0
+        for member in chain:
+            if compiled.must_precede[member] & chain_mask & ~preceding:
+                return None
+            preceding |= 1 << member
+
+        chains.append(tuple(chain))
+        covered |= chain_mask
+
+    # Activities not reachable from a chain head lie on a cycle of direct dependencies
+    if covered != subset_bitset:
+        return None
+    return chains
+
+
+def dependency_components(compiled: CompiledConstraints) -> List[int]:
+    """
+    Splits the activities into groups that share no temporal or existential dependency.
+
+    Returns:
+        The connected components of the dependency graph as activity bitmasks,
+        ordered by their lowest activity index
+    """
+    n = len(compiled.activities)
+    neighbours = [compiled.must_precede[idx] | compiled.must_follow[idx] for idx in range(n)]
+    for src_idx, tgt_idx, _, _ in compiled.existential:
+        neighbours[src_idx] |= 1 << tgt_idx
+        neighbours[tgt_idx] |= 1 << src_idx
+
+    components: List[int] = []
+    unvisited = (1 << n) - 1
+    while unvisited:
+        component = unvisited & -unvisited
+        frontier = component
+        while frontier:
+            bit = frontier & -frontier
+            frontier ^= bit
+            new = neighbours[bit.bit_length() - 1] & ~component
+            component |= new
+            frontier |= new
+        components.append(component)
+        unvisited &= ~component
+    return components
+
+
+def restrict_constraints(compiled: CompiledConstraints, subset_bitset: int) -> CompiledConstraints:
+    """
+    Restricts the constraints to a subset of activities and renumbers them.
+
+    Dependencies to activities outside the subset are dropped, the remaining
+    activities keep their relative order.
+    """
+    kept = [idx for idx in range(len(compiled.activities)) if subset_bitset >> idx & 1]
+    new_idx = {idx: position for position, idx in enumerate(kept)}
+
+    def remap(mask: int) -> int:
+        result = 0
+        for idx in kept:
+            if mask >> idx & 1:
+                result |= 1 << new_idx[idx]
+        return result
+
+    return CompiledConstraints(
+        activities=tuple(compiled.activities[idx] for idx in kept),
+        must_precede=tuple(remap(compiled.must_precede[idx]) for idx in kept),
+        must_follow=tuple(remap(compiled.must_follow[idx]) for idx in kept),
+        direct_predecessor=tuple(remap(compiled.direct_predecessor[idx]) for idx in kept),
+        direct_successor=tuple(remap(compiled.direct_successor[idx]) for idx in kept),
+        existential=tuple(
+            (new_idx[src_idx], new_idx[tgt_idx], dep_type, direction)
+            for src_idx, tgt_idx, dep_type, direction in compiled.existential
+            if src_idx in new_idx and tgt_idx in new_idx
+        ),
+    )
+
+
+class OrderingFeasibility:
+    """
+    Decides which subsets of activities have at least one valid ordering.
+
+    A subset has a valid ordering if and only if its DIRECT dependencies contract
+    into chains and the eventual dependencies between those chains are acyclic.
+    Restricting a valid ordering to fewer activities keeps it valid, so every
+    superset of an infeasible subset is infeasible as well. Each newly found
+    infeasible subset is shrunk to a minimal infeasible core, and any later subset
+    containing a known core is rejected without looking at its dependencies.
+    The engine asks about each subset once, so only the cores are kept, not the
+    answer per subset.
+    """
+
+    def __init__(self, compiled: CompiledConstraints):
+        self.compiled = compiled
+        self._infeasible_cores: List[int] = []
+
+    def is_orderable(self, subset_bitset: int) -> bool:
+        """Checks if the subset has at least one ordering satisfying all temporal constraints."""
+        if any(core & subset_bitset == core for core in self._infeasible_cores):
+            return False
+        if self._check(subset_bitset):
+            return True
+        self._infeasible_cores.append(self._shrink_to_core(subset_bitset))
+        return False
+
+    def _shrink_to_core(self, subset_bitset: int) -> int:
+        """Drops activities from an infeasible subset as long as it stays infeasible."""
+        core = subset_bitset
+        remaining = subset_bitset
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if not self._check(core ^ bit):
+                core ^= bit
+        return core
+
+    def _check(self, subset_bitset: int) -> bool:
+        chains = contract_direct_chains(self.compiled, subset_bitset)
+        if chains is None:
+            return False
+
+        must_precede = self.compiled.must_precede
+        pending = []
+        for chain in chains:
+            chain_mask = 0
+            precede = 0
+            for idx in chain:
+                chain_mask |= 1 << idx
+                precede |= must_precede[idx]
+            pending.append((chain_mask, precede & ~chain_mask))
+
+        # Place chains whose predecessors are all placed until none are left or a cycle remains
+        remaining = subset_bitset
+        while pending:
+            placeable = [chain for chain in pending if not chain[1] & remaining]
+            if not placeable:
+                return False
+            for chain_mask, _ in placeable:
+                remaining &= ~chain_mask
+            pending = [chain for chain in pending if chain[0] & remaining]
+        return True
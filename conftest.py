@@ -4,3 +4,15 @@ import os
 # Some workaround I found that ensures that modules like 'traces_to_matrix' can be found by tests
 # regardless of how pytest is invoked or structured.
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import pytest
+from variant_cache import get_default_cache, set_default_cache
+
+
+@pytest.fixture(autouse=True)
+def no_variant_cache():
+    # Tests must not read stale entries from an on-disk variant cache another test enabled
+    previous = get_default_cache()
+    set_default_cache(None)
+    yield
+    set_default_cache(previous)
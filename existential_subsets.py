@@ -0,0 +1,440 @@
+import heapq
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dependencies import ExistentialType, Direction
+from compiled_constraints import CompiledConstraints
+from generation_budget import GenerationBudget
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python search is used without it
+    np = None
+
+# Largest number of activities whose whole subset space is held in one NumPy array
+VECTORIZED_MAX_ACTIVITIES = 25
+# iter_subsets_by_size switches to the NumPy backend once the search finds this many subsets
+VECTORIZED_MIN_SUBSETS = 4096
+
+# A clause (u, u_value, v, v_value) holds if activity u has presence u_value
+# or activity v has presence v_value.
+Clause = Tuple[int, bool, int, bool]
+
+
+@dataclass(frozen=True)
+class ForcedActivities:
+    """
+    Activities with the same presence in every existentially valid subset.
+
+    - present: activities contained in every valid subset
+    - absent: activities contained in no valid subset
+    - contradiction: True if no subset is valid; present and absent are empty then
+    """
+
+    present: Tuple[str, ...]
+    absent: Tuple[str, ...]
+    contradiction: bool
+
+
+def existential_clauses(compiled: CompiledConstraints) -> List[Clause]:
+    """
+    Translates the existential dependencies into 2-CNF clauses over activity indices.
+
+    Every ExistentialType is a conjunction of at most two binary clauses:
+    - IMPLICATION a => b: (not a or b)
+    - EQUIVALENCE a <=> b: (not a or b) and (a or not b)
+    - NEGATED_EQUIVALENCE a <~> b: (a or b) and (not a or not b)
+    - NAND a | b: (not a or not b)
+    - OR a v b: (a or b)
+    """
+    clauses: List[Clause] = []
+    for src_idx, tgt_idx, dep_type, direction in compiled.existential:
+        if direction == Direction.BACKWARD:
+            src_idx, tgt_idx = tgt_idx, src_idx
+
+        if dep_type == ExistentialType.IMPLICATION:
+            clauses.append((src_idx, False, tgt_idx, True))
+        elif dep_type == ExistentialType.EQUIVALENCE:
+            clauses.append((src_idx, False, tgt_idx, True))
+            clauses.append((src_idx, True, tgt_idx, False))
+        elif dep_type == ExistentialType.NEGATED_EQUIVALENCE:
+            clauses.append((src_idx, True, tgt_idx, True))
+            clauses.append((src_idx, False, tgt_idx, False))
+        elif dep_type == ExistentialType.NAND:
+            clauses.append((src_idx, False, tgt_idx, False))
+        elif dep_type == ExistentialType.OR:
+            clauses.append((src_idx, True, tgt_idx, True))
+        elif dep_type != ExistentialType.INDEPENDENCE:
+            raise ValueError(f"Unsupported existential relationship type: {dep_type}")
+    return clauses
+
+
+def literal_closures(n: int, clauses: List[Clause]) -> List[Tuple[int, int]]:
+    """
+    Computes, for every literal, all literals it implies in the implication graph.
+
+    The literal "activity i has presence value" has index 2 * i + value. Its closure
+    is returned as (present_mask, absent_mask) of the activities it forces.
+    """
+    successors: List[List[int]] = [[] for _ in range(2 * n)]
+    for u, u_value, v, v_value in clauses:
+        # (u or v) is equivalent to (not u => v) and (not v => u)
+        successors[2 * u + (not u_value)].append(2 * v + v_value)
+        successors[2 * v + (not v_value)].append(2 * u + u_value)
+
+    closures = []
+    for literal in range(2 * n):
+        reached = {literal}
+        stack = [literal]
+        while stack:
+            for nxt in successors[stack.pop()]:
+                if nxt not in reached:
+                    reached.add(nxt)
+                    stack.append(nxt)
+        present_mask = 0
+        absent_mask = 0
+        for lit in reached:
+            if lit & 1:
+                present_mask |= 1 << (lit >> 1)
+            else:
+                absent_mask |= 1 << (lit >> 1)
+        closures.append((present_mask, absent_mask))
+    return closures
+
+
+def equivalence_classes(compiled: CompiledConstraints) -> List[int]:
+    """
+    Groups the activities that are linked by EQUIVALENCE dependencies.
+
+    Members of a class are either all present or all absent in a valid subset.
+
+    Returns:
+        The classes as activity bitmasks, ordered by their lowest activity index
+    """
+    n = len(compiled.activities)
+    parent = list(range(n))
+
+    def find(idx: int) -> int:
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    for src_idx, tgt_idx, dep_type, _ in compiled.existential:
+        if dep_type == ExistentialType.EQUIVALENCE:
+            src_root, tgt_root = find(src_idx), find(tgt_idx)
+            if src_root != tgt_root:
+                parent[max(src_root, tgt_root)] = min(src_root, tgt_root)
+
+    class_masks: Dict[int, int] = {}
+    for idx in range(n):
+        root = find(idx)
+        class_masks[root] = class_masks.get(root, 0) | 1 << idx
+    return list(class_masks.values())
+
+
+def forced_literals(n: int, closures: List[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Propagates the literals that hold in every satisfying assignment.
+
+    A literal that implies its own negation can never hold, so the opposite literal
+    and everything it implies are forced.
+
+    Returns:
+        (present_mask, absent_mask) of the forced activities. The masks intersect
+        if and only if the clauses are unsatisfiable.
+    """
+    present, absent = 0, 0
+    for idx in range(n):
+        bit = 1 << idx
+        for value in (False, True):
+            forced_present, forced_absent = closures[2 * idx + value]
+            if (forced_absent if value else forced_present) & bit:
+                opposite_present, opposite_absent = closures[2 * idx + (not value)]
+                present |= opposite_present
+                absent |= opposite_absent
+    return present, absent
+
+
+def find_forced_activities(compiled: CompiledConstraints) -> ForcedActivities:
+    """
+    Finds the activities whose presence is fixed by the existential constraints.
+
+    Args:
+        compiled: The compiled constraints of a process
+
+    Returns:
+        The activities present in every and absent from every existentially valid
+        subset, and whether the existential constraints contradict each other
+    """
+    n = len(compiled.activities)
+    present, absent = forced_literals(n, literal_closures(n, existential_clauses(compiled)))
+    if present & absent:
+        return ForcedActivities(present=(), absent=(), contradiction=True)
+    return ForcedActivities(
+        present=tuple(activity for idx, activity in enumerate(compiled.activities) if present >> idx & 1),
+        absent=tuple(activity for idx, activity in enumerate(compiled.activities) if absent >> idx & 1),
+        contradiction=False,
+    )
+
+
+def iter_existential_subsets(compiled: CompiledConstraints) -> Iterator[int]:
+    """
+    Yields the bitsets of all activity subsets that satisfy the existential constraints.
+
+    Branches on one equivalence class at a time and propagates the choice through
+    the implication graph. A NEGATED_EQUIVALENCE inside a class makes every subset
+    invalid. Literals that imply their own negation are fixed before the search;
+    after that every propagated branch of a 2-CNF formula is satisfiable, so the
+    search never enters a branch without a valid subset.
+    """
+    start = _search_start(compiled)
+    if start is None:
+        return
+    closures, present, absent = start
+
+    # The closure of any member covers its whole class, so one member per class suffices
+    representatives = [
+        (class_mask & -class_mask).bit_length() - 1 for class_mask in equivalence_classes(compiled)
+    ]
+
+    def assign(position: int, present: int, absent: int) -> Iterator[int]:
+        while position < len(representatives) and (present | absent) >> representatives[position] & 1:
+            position += 1
+        if position == len(representatives):
+            yield present
+            return
+        idx = representatives[position]
+        for value in (False, True):
+            forced_present, forced_absent = closures[2 * idx + value]
+            yield from assign(position + 1, present | forced_present, absent | forced_absent)
+
+    yield from assign(0, present, absent)
+
+
+def _search_start(compiled: CompiledConstraints) -> Optional[Tuple[List[Tuple[int, int]], int, int]]:
+    """
+    Returns the literal closures and the forced (present, absent) masks, or None if no subset is valid.
+    """
+    n = len(compiled.activities)
+    class_of = [0] * n
+    for class_mask in equivalence_classes(compiled):
+        for idx in range(n):
+            if class_mask >> idx & 1:
+                class_of[idx] = class_mask
+    for src_idx, tgt_idx, dep_type, _ in compiled.existential:
+        if dep_type == ExistentialType.NEGATED_EQUIVALENCE and class_of[src_idx] == class_of[tgt_idx]:
+            return None
+
+    closures = literal_closures(n, existential_clauses(compiled))
+    present, absent = forced_literals(n, closures)
+    if present & absent:
+        return None
+    return closures, present, absent
+
+
+def _iter_subsets_of_size(
+    n: int,
+    closures: List[Tuple[int, int]],
+    present: int,
+    absent: int,
+    size: int,
+    budget: Optional[GenerationBudget],
+) -> Iterator[int]:
+    """
+    Yields the valid subsets with exactly `size` activities in combination order.
+
+    Activities are decided in index order, trying presence first, so a subset
+    containing the lower activity comes first. A branch is cut off as soon as the
+    decided activities cannot end with `size` present ones. This bound does not
+    see the implications between the undecided activities, so a branch can still
+    end without a subset, e.g. when one slot is left for two EQUIVALENCE
+    activities. The budget is checked on every step, so such branches cannot
+    delay it.
+    """
+    def assign(idx: int, present: int, absent: int) -> Iterator[int]:
+        if budget is not None:
+            budget.check()
+        count = bin(present).count("1")
+        decided = present | absent
+        if count > size or count + n - bin(decided).count("1") < size:
+            return
+        while idx < n and decided >> idx & 1:
+            idx += 1
+        if idx == n:
+            yield present
+            return
+        for value in (True, False):
+            forced_present, forced_absent = closures[2 * idx + value]
+            yield from assign(idx + 1, present | forced_present, absent | forced_absent)
+
+    yield from assign(0, present, absent)
+
+
+def vectorized_valid_subsets(
+    compiled: CompiledConstraints, budget: Optional[GenerationBudget] = None
+) -> "np.ndarray":
+    """
+    Computes the bitsets of all existentially valid subsets with NumPy.
+
+    Every subset of the activities is one uint32 entry, and each clause is applied
+    as a vectorized bit expression to all of them at once.
+
+    Args:
+        compiled: The compiled constraints of a process
+        budget: Checked for the deadline and cancellation before every clause
+
+    Returns:
+        The valid bitsets in ascending order
+
+    Raises:
+        ValueError: If NumPy is not installed or there are more than
+            VECTORIZED_MAX_ACTIVITIES activities
+        BudgetExceeded: If the deadline passes or the generation is cancelled
+    """
+    n = len(compiled.activities)
+    if np is None:
+        raise ValueError("The vectorized subset backend requires NumPy")
+    if n > VECTORIZED_MAX_ACTIVITIES:
+        raise ValueError(
+            f"The vectorized subset backend supports at most {VECTORIZED_MAX_ACTIVITIES} activities, got {n}"
+        )
+
+    subsets = np.arange(1 << n, dtype=np.uint32)
+    valid = np.ones(1 << n, dtype=bool)
+    for u, u_value, v, v_value in existential_clauses(compiled):
+        if budget is not None:
+            budget.check()
+        u_present = (subsets >> np.uint32(u)) & np.uint32(1)
+        v_present = (subsets >> np.uint32(v)) & np.uint32(1)
+        valid &= (u_present == u_value) | (v_present == v_value)
+    return subsets[valid]
+
+
+def iter_subsets_by_size(
+    compiled: CompiledConstraints, budget: Optional[GenerationBudget] = None, min_size: int = 0
+) -> Iterator[int]:
+    """
+    Yields the existentially valid subsets in increasing size.
+
+    Within a size, subsets are ordered lexicographically by their activity indices,
+    which is the order in which combinations of that size are generated.
+
+    The search over the implication graph only visits valid subsets, which is
+    fastest when few subsets are valid. If it finds VECTORIZED_MIN_SUBSETS subsets,
+    the subsets are enumerated one size at a time instead, so only the current
+    size is held in memory: with NumPy, the vectorized backend validates all
+    subsets and sorts one size at a time; without it, the search is repeated per
+    size with the size as an additional bound.
+
+    Args:
+        compiled: The compiled constraints of a process
+        budget: Checked for the deadline and cancellation during the enumeration,
+            also while no valid subset is found
+        min_size: Size of the smallest subsets to yield
+
+    Raises:
+        BudgetExceeded: If the deadline passes or the generation is cancelled
+    """
+    n = len(compiled.activities)
+    found = list(islice(iter_existential_subsets(compiled), VECTORIZED_MIN_SUBSETS))
+    if len(found) < VECTORIZED_MIN_SUBSETS:
+        # The search already found every valid subset
+        found.sort(key=lambda subset_bitset: (bin(subset_bitset).count("1"), [
+            idx for idx in range(subset_bitset.bit_length()) if subset_bitset >> idx & 1
+        ]))
+        for subset_bitset in found:
+            if bin(subset_bitset).count("1") >= min_size:
+                yield subset_bitset
+        return
+
+    if np is not None and n <= VECTORIZED_MAX_ACTIVITIES:
+        yield from _iter_vectorized_subsets_by_size(compiled, budget, min_size)
+        return
+    closures, present, absent = _search_start(compiled)
+    for size in range(min_size, n + 1):
+        yield from _iter_subsets_of_size(n, closures, present, absent, size, budget)
+
+
+def iter_matching_subsets(
+    compiled: CompiledConstraints,
+    conditions: Iterable[Sequence[Tuple[int, bool]]],
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[int]:
+    """
+    Yields the existentially valid subsets that match at least one presence condition.
+
+    A condition is a sequence of (activity index, present) pairs that a subset has
+    to satisfy. Each condition is propagated through the implication graph and
+    searched on its own, so subsets that match no condition are never visited.
+    The searches are merged per size, and a subset matching several conditions is
+    yielded once.
+
+    Args:
+        compiled: The compiled constraints of a process
+        conditions: The presence conditions
+        budget: Checked for the deadline and cancellation during the search
+
+    Returns:
+        The matching subsets in the order of iter_subsets_by_size
+
+    Raises:
+        BudgetExceeded: If the deadline passes or the generation is cancelled
+    """
+    start = _search_start(compiled)
+    if start is None:
+        return
+    closures, present, absent = start
+
+    seeds = set()
+    for condition in conditions:
+        seed_present, seed_absent = present, absent
+        for idx, value in condition:
+            forced_present, forced_absent = closures[2 * idx + value]
+            seed_present |= forced_present
+            seed_absent |= forced_absent
+        if not seed_present & seed_absent:
+            seeds.add((seed_present, seed_absent))
+    if not seeds:
+        return
+
+    n = len(compiled.activities)
+
+    def combination_key(subset_bitset: int) -> List[int]:
+        return [idx for idx in range(subset_bitset.bit_length()) if subset_bitset >> idx & 1]
+
+    for size in range(n + 1):
+        searches = [
+            _iter_subsets_of_size(n, closures, seed_present, seed_absent, size, budget)
+            for seed_present, seed_absent in seeds
+        ]
+        previous = None
+        for subset_bitset in heapq.merge(*searches, key=combination_key):
+            if subset_bitset != previous:
+                yield subset_bitset
+            previous = subset_bitset
+
+
+def _iter_vectorized_subsets_by_size(
+    compiled: CompiledConstraints, budget: Optional[GenerationBudget], min_size: int
+) -> Iterator[int]:
+    n = len(compiled.activities)
+    subsets = vectorized_valid_subsets(compiled, budget)
+
+    sizes = np.zeros(len(subsets), dtype=np.uint8)
+    reversed_bits = np.zeros(len(subsets), dtype=np.uint32)
+    for idx in range(n):
+        if budget is not None:
+            budget.check()
+        bit = (subsets >> np.uint32(idx)) & np.uint32(1)
+        sizes += bit.astype(np.uint8)
+        reversed_bits |= bit << np.uint32(n - 1 - idx)
+
+    for size in range(min_size, n + 1):
+        if budget is not None:
+            budget.check()
+        in_size = sizes == size
+        # Among subsets of one size, the one containing the lowest differing activity
+        # comes first, i.e. the larger bit-reversed value
+        order = np.argsort(~reversed_bits[in_size])
+        yield from subsets[in_size][order].tolist()
@@ -0,0 +1,179 @@
+from itertools import product
+from typing import Iterator, List, Optional, Tuple
+from adjacency_matrix import AdjacencyMatrix
+from compiled_constraints import CompiledConstraints, compile_constraints, dependency_components, restrict_constraints
+from generation_budget import GenerationBudget, estimate_variant_bytes
+from optimized_acceptance_variants import count_interleavings, iter_compiled_variants
+from variant_cache import VariantCache, get_default_cache
+
+# A variant of one component, split into the blocks that have to stay contiguous
+BlockVariant = Tuple[Tuple[str, ...], ...]
+
+
+class FactoredVariants:
+    """
+    Acceptance variants of a process in factored form.
+
+    The activities are split into components that share no dependency with each
+    other. Only the variants of each component are stored; full acceptance variants
+    are produced on demand by choosing one variant per component and interleaving
+    their blocks. A block is a chain of DIRECT dependencies and is never split up.
+    """
+
+    def __init__(self, components: List[Tuple[str, ...]], component_variants: List[List[BlockVariant]]):
+        self.components = components
+        self.component_variants = component_variants
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for choice in product(*self.component_variants):
+            yield from _interleave_blocks([blocks for blocks in choice if blocks])
+
+    def count(self) -> int:
+        """Counts the acceptance variants without producing them."""
+        counts_by_blocks = []
+        for variants in self.component_variants:
+            counts = [0] * (max((len(blocks) for blocks in variants), default=0) + 1)
+            for blocks in variants:
+                counts[len(blocks)] += 1
+            counts_by_blocks.append(counts)
+        return count_interleavings(counts_by_blocks)
+
+
+def factor_acceptance_variants(
+    adj_matrix: AdjacencyMatrix, budget: Optional[GenerationBudget] = None
+) -> FactoredVariants:
+    """
+    Enumerates the acceptance variants of each independent component of a matrix separately.
+
+    Args:
+        adj_matrix: The adjacency matrix to generate the variants for
+        budget: Checked for the deadline and cancellation while the components are searched
+
+    Returns:
+        The variants in factored form
+
+    Raises:
+        BudgetExceeded: If the deadline passes or the generation is cancelled
+    """
+    return factor_compiled_variants(compile_constraints(adj_matrix), get_default_cache(), budget)
+
+
+def factor_compiled_variants(
+    compiled: CompiledConstraints,
+    cache: Optional[VariantCache] = None,
+    budget: Optional[GenerationBudget] = None,
+) -> FactoredVariants:
+    """
+    Enumerates the acceptance variants of each independent component of compiled constraints.
+
+    Each component is searched on its own, and served from the cache if possible.
+    """
+    components = dependency_components(compiled)
+    return FactoredVariants(
+        [restrict_constraints(compiled, component).activities for component in components],
+        _store_component_variants(compiled, components, cache, budget),
+    )
+
+
+def iter_factored_variants(
+    compiled: CompiledConstraints,
+    cache: Optional[VariantCache] = None,
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[List[str]]:
+    """
+    Yields the acceptance variants of compiled constraints, searching each component on its own.
+
+    The component with the most activities is streamed; only the variants of the
+    other components are stored. For every variant of the streamed component, all
+    choices of the stored variants are interleaved with it. With a single
+    component this is the joint search of iter_compiled_variants.
+
+    Raises:
+        BudgetExceeded: If the budget is exceeded while the stored components are built
+    """
+    components = dependency_components(compiled)
+    if len(components) <= 1:
+        yield from iter_compiled_variants(compiled, cache, budget)
+        return
+
+    streamed = max(components, key=lambda component: bin(component).count("1"))
+    stored = _store_component_variants(
+        compiled, [component for component in components if component != streamed], cache, budget
+    )
+    for blocks in _iter_block_variants(restrict_constraints(compiled, streamed), cache, budget):
+        for choice in product(*stored):
+            yield from _interleave_blocks([sequence for sequence in (blocks,) + choice if sequence])
+
+
+def _store_component_variants(
+    compiled: CompiledConstraints,
+    components: List[int],
+    cache: Optional[VariantCache],
+    budget: Optional[GenerationBudget],
+) -> List[List[BlockVariant]]:
+    """
+    Collects the block variants of each given component.
+
+    The budget is checked for every stored variant: the memory limit against the
+    stored variants, the variant limit against the full variants they already
+    imply, i.e. one per choice of a variant of each component built so far.
+    """
+    component_variants = []
+    implied = 1
+    memory_estimate = 0
+    for component in components:
+        variants = []
+        for blocks in _iter_block_variants(restrict_constraints(compiled, component), cache, budget):
+            variants.append(blocks)
+            if budget is not None:
+                memory_estimate += estimate_variant_bytes(sum(len(block) for block in blocks))
+                budget.check(implied * len(variants), memory_estimate)
+        implied *= len(variants)
+        component_variants.append(variants)
+    return component_variants
+
+
+def _iter_block_variants(
+    restricted: CompiledConstraints, cache: Optional[VariantCache], budget: Optional[GenerationBudget]
+) -> Iterator[BlockVariant]:
+    """
+    Yields the variants of one component, split into their DIRECT blocks.
+    """
+    activity_to_idx = {activity: idx for idx, activity in enumerate(restricted.activities)}
+    direct_successor = restricted.direct_successor
+    for variant in iter_compiled_variants(restricted, cache, budget):
+        blocks = []
+        for position, activity in enumerate(variant):
+            # The activity continues the block of its direct predecessor
+            if position and direct_successor[activity_to_idx[variant[position - 1]]] >> activity_to_idx[activity] & 1:
+                blocks[-1].append(activity)
+            else:
+                blocks.append([activity])
+        yield tuple(tuple(block) for block in blocks)
+
+
+def _interleave_blocks(block_sequences: List[BlockVariant]) -> Iterator[List[str]]:
+    """
+    Yields every interleaving of the given block sequences that keeps each sequence's order.
+    """
+    total = sum(len(blocks) for blocks in block_sequences)
+    positions = [0] * len(block_sequences)
+    current_path: List[str] = []
+
+    def step(placed: int) -> Iterator[List[str]]:
+        if placed == total:
+            yield current_path.copy()
+            return
+        for seq_idx, blocks in enumerate(block_sequences):
+            if positions[seq_idx] == len(blocks):
+                continue
+            block = blocks[positions[seq_idx]]
+            positions[seq_idx] += 1
+            current_path.extend(block)
+
+            yield from step(placed + 1)
+
+            del current_path[-len(block):]
+            positions[seq_idx] -= 1
+
+    yield from step(0)
@@ -0,0 +1,126 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+# Rough size of a variant held as a list: list header plus one pointer per activity
+_LIST_OVERHEAD_BYTES = 56
+_POINTER_BYTES = 8
+
+
+def estimate_variant_bytes(length: int) -> int:
+    """Estimates the memory of a variant of the given length held as a list."""
+    return _LIST_OVERHEAD_BYTES + _POINTER_BYTES * length
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when variant generation exceeds its GenerationBudget or is cancelled.
+
+    Attributes:
+        reason: Which limit was hit
+        variants_generated: Number of variants found when the limit was hit, including
+            the one that exceeded it
+        memory_estimate: Estimated memory of those variants in bytes
+        partial_variants: The variants handed out before the limit was hit, if the
+            caller collected them
+    """
+
+    def __init__(
+        self,
+        reason: str,
+        variants_generated: int,
+        memory_estimate: int,
+        partial_variants: Optional[List[List[str]]] = None,
+    ):
+        super().__init__(f"Variant generation stopped: {reason} after {variants_generated} variants")
+        self.reason = reason
+        self.variants_generated = variants_generated
+        self.memory_estimate = memory_estimate
+        self.partial_variants = partial_variants
+
+    def __reduce__(self):
+        # Keeps the attributes when the exception is sent back from a worker process
+        return (
+            BudgetExceeded,
+            (self.reason, self.variants_generated, self.memory_estimate, self.partial_variants),
+        )
+
+
+class CancellationToken:
+    """A flag another thread can set to stop a running generation."""
+
+    def __init__(self):
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+@dataclass(frozen=True)
+class GenerationBudget:
+    """
+    Limits for one variant generation. Every limit is optional.
+
+    - deadline: time.monotonic() value after which generation stops
+    - max_variants: largest number of variants that may be produced
+    - max_memory_bytes: largest estimated memory of the produced variants
+    - cancellation: token that stops generation once cancelled
+    """
+
+    deadline: Optional[float] = None
+    max_variants: Optional[int] = None
+    max_memory_bytes: Optional[int] = None
+    cancellation: Optional[CancellationToken] = None
+
+    @classmethod
+    def from_limits(
+        cls,
+        timeout: Optional[float] = None,
+        max_variants: Optional[int] = None,
+        max_memory_bytes: Optional[int] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> "GenerationBudget":
+        """
+        Creates a budget whose deadline is `timeout` seconds from now.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        return cls(deadline, max_variants, max_memory_bytes, cancellation)
+
+    def check(self, variants_generated: int = 0, memory_estimate: int = 0) -> None:
+        """
+        Checks all limits against the progress so far.
+
+        Raises:
+            BudgetExceeded: If any limit is exceeded or the generation was cancelled
+        """
+        reason = None
+        if self.cancellation is not None and self.cancellation.cancelled:
+            reason = "cancelled"
+        elif self.max_variants is not None and variants_generated > self.max_variants:
+            reason = f"more than {self.max_variants} variants"
+        elif self.max_memory_bytes is not None and memory_estimate > self.max_memory_bytes:
+            reason = f"estimated memory above {self.max_memory_bytes} bytes"
+        elif self.deadline is not None and time.monotonic() > self.deadline:
+            reason = "deadline exceeded"
+        if reason is not None:
+            raise BudgetExceeded(reason, variants_generated, memory_estimate)
+
+    def enforce(self, variants: Iterable[Sequence]) -> Iterator:
+        """
+        Passes variants through while checking the budget before each one.
+
+        Only emitted variants are seen here; between two variants the engine
+        checks the deadline and cancellation itself while it skips subsets.
+        """
+        self.check()
+        variants_generated = 0
+        memory_estimate = 0
+        for variant in variants:
+            variants_generated += 1
+            memory_estimate += estimate_variant_bytes(len(variant))
+            self.check(variants_generated, memory_estimate)
+            yield variant
@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from adjacency_matrix import AdjacencyMatrix
+from compiled_constraints import OrderingFeasibility, compile_constraints
+from constraint_logic import check_existential_relationship, check_temporal_relationship
+from dependencies import ExistentialDependency, TemporalDependency
+from existential_subsets import iter_matching_subsets
+from generation_budget import BudgetExceeded, GenerationBudget
+from optimized_acceptance_variants import iter_subset_orderings
+
+Cell = Tuple[str, str]
+Dependency = Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]]
+
+# Positions of source and target (None if absent) covering every case the
+# dependency checks distinguish: absent, directly or eventually before or after
+_PAIR_SAMPLES = ((None, None), (0, None), (None, 0), (0, 1), (1, 0), (0, 2), (2, 0))
+_SELF_SAMPLES = ((None, None), (0, 0))
+
+
+def changed_dependency_cells(old_matrix: AdjacencyMatrix, new_matrix: AdjacencyMatrix) -> List[Cell]:
+    """
+    Finds the cells whose dependencies admit different variants in the two matrices.
+
+    Cells that only differ in form, e.g. a missing dependency and an INDEPENDENCE
+    dependency, are not reported.
+    """
+    old_deps = old_matrix.get_dependencies()
+    new_deps = new_matrix.get_dependencies()
+    changed = []
+    for cell in sorted(set(old_deps) | set(new_deps)):
+        old_dep, new_dep = old_deps.get(cell), new_deps.get(cell)
+        if any(
+            _satisfies(old_dep, *sample) != _satisfies(new_dep, *sample)
+            for sample in _samples(cell)
+        ):
+            changed.append(cell)
+    return changed
+
+
+def update_acceptance_variants(
+    previous_variants: Iterable[Sequence[str]],
+    old_matrix: AdjacencyMatrix,
+    new_matrix: AdjacencyMatrix,
+    changed_cells: Optional[Iterable[Cell]] = None,
+    budget: Optional[GenerationBudget] = None,
+) -> List[List[str]]:
+    """
+    Derives the acceptance variants of a modified matrix from those of the original.
+
+    Every old variant already satisfies the unchanged cells, so it is kept if it
+    satisfies the new dependencies of the changed cells. Variants that did not
+    exist before can only appear where a changed cell admits more than it used
+    to; the search is seeded with the presence of the activities of such a cell,
+    so it only visits subsets on which a cell was loosened, and only the
+    orderings the old dependencies rejected are added. A change that only
+    tightens cells costs a single filtering pass.
+
+    Args:
+        previous_variants: All acceptance variants of old_matrix
+        old_matrix: The matrix the previous variants belong to
+        new_matrix: The modified matrix, over the same activities
+        changed_cells: The (from, to) cells that differ between the matrices.
+            Computed with changed_dependency_cells if omitted.
+        budget: Limits for searching the added variants
+
+    Returns:
+        The acceptance variants of new_matrix, in the order of iter_acceptance_variants
+
+    Raises:
+        ValueError: If the matrices have different activities
+        BudgetExceeded: If the budget is exceeded
+    """
+    if list(old_matrix.activities) != list(new_matrix.activities):
+        raise ValueError("Incremental updates require matrices over the same activities")
+    if changed_cells is None:
+        changed_cells = changed_dependency_cells(old_matrix, new_matrix)
+
+    old_deps = old_matrix.get_dependencies()
+    new_deps = new_matrix.get_dependencies()
+    cells = [(cell, old_deps.get(cell), new_deps.get(cell)) for cell in changed_cells]
+
+    kept = []
+    for variant in previous_variants:
+        positions = _positions(variant)
+        if all(_satisfies_in(new_dep, cell, positions) for cell, _, new_dep in cells):
+            kept.append(list(variant))
+
+    added: List[List[str]] = []
+    added_orderings = _iter_added_orderings(new_matrix, cells, budget)
+    if budget is not None:
+        added_orderings = budget.enforce(added_orderings)
+    activities = new_matrix.activities
+    try:
+        for ordering in added_orderings:
+            added.append([activities[idx] for idx in ordering])
+    except BudgetExceeded as e:
+        e.partial_variants = kept + added
+        raise
+
+    if not added:
+        return kept
+    # Both runs are already in canonical order, which sorted() merges in linear time
+    activity_to_idx = {activity: idx for idx, activity in enumerate(activities)}
+    return sorted(kept + added, key=lambda variant: _canonical_key(variant, activity_to_idx))
+
+
+def _iter_added_orderings(
+    new_matrix: AdjacencyMatrix,
+    cells: List[Tuple[Cell, Optional[Dependency], Optional[Dependency]]],
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[List[int]]:
+    """
+    Yields the orderings valid for new_matrix that the old dependencies of the cells reject.
+    """
+    activity_to_idx = {activity: idx for idx, activity in enumerate(new_matrix.activities)}
+
+    # Per loosened cell: the presence of its activities for which it admits something new
+    conditions = {
+        ((activity_to_idx[cell[0]], source_pos is not None), (activity_to_idx[cell[1]], target_pos is not None))
+        for cell, old_dep, new_dep in cells
+        for source_pos, target_pos in _samples(cell)
+        if _satisfies(new_dep, source_pos, target_pos) and not _satisfies(old_dep, source_pos, target_pos)
+    }
+    if not conditions:
+        return
+
+    compiled = compile_constraints(new_matrix)
+    feasibility = OrderingFeasibility(compiled)
+    for subset_bitset in iter_matching_subsets(compiled, conditions, budget):
+        if budget is not None:
+            budget.check()
+        if not feasibility.is_orderable(subset_bitset):
+            continue
+        for ordering in iter_subset_orderings(compiled, subset_bitset):
+            positions = _positions([new_matrix.activities[idx] for idx in ordering])
+            if not all(_satisfies_in(old_dep, cell, positions) for cell, old_dep, _ in cells):
+                yield ordering
+
+
+def _samples(cell: Cell) -> Tuple[Tuple[Optional[int], Optional[int]], ...]:
+    return _SELF_SAMPLES if cell[0] == cell[1] else _PAIR_SAMPLES
+
+
+def _positions(variant: Sequence[str]) -> Dict[str, int]:
+    return {activity: pos for pos, activity in enumerate(variant)}
+
+
+def _satisfies_in(dependency: Optional[Dependency], cell: Cell, positions: Dict[str, int]) -> bool:
+    return _satisfies(dependency, positions.get(cell[0]), positions.get(cell[1]))
+
+
+def _satisfies(dependency: Optional[Dependency], source_pos: Optional[int], target_pos: Optional[int]) -> bool:
+    """
+    Checks one cell's dependencies against the positions of its activities (None if absent).
+    """
+    if dependency is None:
+        return True
+    temporal_dep, existential_dep = dependency
+    if existential_dep is not None and not check_existential_relationship(
+        source_pos is not None, target_pos is not None, existential_dep.type, existential_dep.direction
+    ):
+        return False
+    # A temporal dependency of an activity on itself never constrains a variant
+    if temporal_dep is None or source_pos is None or target_pos is None or source_pos == target_pos:
+        return True
+    return check_temporal_relationship(source_pos, target_pos, temporal_dep.type, temporal_dep.direction)
+
+
+def _canonical_key(variant: Sequence[str], activity_to_idx: Dict[str, int]) -> Tuple:
+    """Orders variants by size, then subset in combination order, then permutation."""
+    indices = tuple(activity_to_idx[activity] for activity in variant)
+    return len(indices), tuple(sorted(indices)), indices
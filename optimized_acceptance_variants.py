@@ -1,264 +1,739 @@
-from itertools import permutations
-from typing import List, Tuple, Dict, Set, Optional, FrozenSet
-from functools import lru_cache
-from dependencies import (
-    TemporalType,
-    ExistentialType,
-    TemporalDependency,
-    ExistentialDependency,
-    Direction,
-)
+import heapq
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+from math import comb
+from random import Random
+from typing import Callable, List, Tuple, Dict, Iterator, Optional, Sequence
 from adjacency_matrix import AdjacencyMatrix
-from constraint_logic import check_temporal_relationship, check_existential_relationship
-from acceptance_variants import satisfies_temporal_constraints, satisfies_existential_constraints
+from compiled_constraints import (
+    CompiledConstraints,
+    OrderingFeasibility,
+    compile_constraints,
+    contract_direct_chains,
+    dependency_components,
+    restrict_constraints,
+)
+from existential_subsets import iter_existential_subsets, iter_subsets_by_size
+from generation_budget import BudgetExceeded, GenerationBudget, estimate_variant_bytes
+from variant_cache import VariantCache, get_default_cache
+from variant_checkpoint import CheckpointWriter, load_checkpoint
+from variant_set import VariantSet
+from variant_trie import VariantTrie
+
+
+# Chunks of subsets per worker process, so finished chunks can be handed out early
+PARALLEL_CHUNKS_PER_WORKER = 4
+# Seconds between two checks of the deadline and cancellation while waiting for workers
+PARALLEL_POLL_SECONDS = 0.05
+
+# Part of every variant cache key. Bump it whenever a change to the search alters
+# the variants it yields or their order, so that cached entries are not reused.
+ENGINE_VERSION = 1
 
 
-def generate_optimized_acceptance_variants(adj_matrix: AdjacencyMatrix) -> List[List[str]]:
+def generate_optimized_acceptance_variants(
+    adj_matrix: AdjacencyMatrix,
+    workers: Optional[int] = None,
+    budget: Optional[GenerationBudget] = None,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    checkpoint_every: int = 10000,
+) -> List[List[str]]:
     """
     Generates all valid acceptance variants from an adjacency matrix using an optimized approach.
-    
-    Optimizations:
-    1. Uses cached validation functions
-    2. Employs directed graph logic for temporal constraints to prune invalid permutations early
-    3. Processes existential constraints before generating permutations
-    4. Uses bitwise operations for faster subset generation and validation
-    """
-    activities = adj_matrix.activities
-    temporal_deps: Dict[Tuple[str, str], TemporalDependency] = {}
-    existential_deps: Dict[Tuple[str, str], ExistentialDependency] = {}
-    
-    # Extract dependencies
-    for (source, target), (temp_dep, exist_dep) in adj_matrix.dependencies.items():
-        if temp_dep:
-            temporal_deps[(source, target)] = temp_dep
-        if exist_dep:
-            existential_deps[(source, target)] = exist_dep
-    
-    # Convert activities to indices for faster operations
-    activity_to_idx = {activity: idx for idx, activity in enumerate(activities)}
-    idx_to_activity = {idx: activity for idx, activity in enumerate(activities)}
-    
-    # Create a directed graph representation of direct temporal constraints
-    direct_constraints = {}
-    eventual_constraints = {}
-    for (source, target), dep in temporal_deps.items():
-        if dep.type == TemporalType.DIRECT and dep.direction in [Direction.FORWARD, Direction.BOTH]:
-            src_idx = activity_to_idx[source]
-            tgt_idx = activity_to_idx[target]
-            if src_idx not in direct_constraints:
-                direct_constraints[src_idx] = set()
-            direct_constraints[src_idx].add(tgt_idx)
-        
-        if dep.type == TemporalType.EVENTUAL and dep.direction in [Direction.FORWARD, Direction.BOTH]:
-            src_idx = activity_to_idx[source]
-            tgt_idx = activity_to_idx[target]
-            if src_idx not in eventual_constraints:
-                eventual_constraints[src_idx] = set()
-            eventual_constraints[src_idx].add(tgt_idx)
-    
-    # Create reverse direct constraints (for backward direction)
-    reverse_direct_constraints = {}
-    reverse_eventual_constraints = {}
-    for (source, target), dep in temporal_deps.items():
-        if dep.type == TemporalType.DIRECT and dep.direction in [Direction.BACKWARD, Direction.BOTH]:
-            src_idx = activity_to_idx[source]
-            tgt_idx = activity_to_idx[target]
-            if tgt_idx not in reverse_direct_constraints:
-                reverse_direct_constraints[tgt_idx] = set()
-            reverse_direct_constraints[tgt_idx].add(src_idx)
-        
-        if dep.type == TemporalType.EVENTUAL and dep.direction in [Direction.BACKWARD, Direction.BOTH]:
-            src_idx = activity_to_idx[source]
-            tgt_idx = activity_to_idx[target]
-            if tgt_idx not in reverse_eventual_constraints:
-                reverse_eventual_constraints[tgt_idx] = set()
-            reverse_eventual_constraints[tgt_idx].add(src_idx)
-    
-    # Cache for existential constraint validation
-    @lru_cache(maxsize=1024)
-    def satisfies_existential_constraints_cached(subset_bitset: int) -> bool:
-        """
-        Checks if a subset of activities satisfies all existential constraints.
-        Uses bitset for faster operations.
-        """
-        for (src, tgt), dependency in existential_deps.items():
-            src_idx = activity_to_idx[src]
-            tgt_idx = activity_to_idx[tgt]
-            
-            in_subset_src = (subset_bitset & (1 << src_idx)) > 0
-            in_subset_tgt = (subset_bitset & (1 << tgt_idx)) > 0
-            
-            if dependency.type == ExistentialType.INDEPENDENCE:
-                continue
 
-            if dependency.type == ExistentialType.OR:
-                # at least one must be present
-                if not (in_subset_src or in_subset_tgt):
-                    return False
-                continue
+    Args:
+        adj_matrix: The adjacency matrix to generate the variants for
+        workers: Number of worker processes. If greater than 1, the existentially valid
+            subsets are distributed over a process pool and the results are merged in
+            the same order as the sequential search produces them.
+        budget: Limits for the generation. With workers, every finished chunk is
+            counted against the variant and memory limits right away, and the
+            deadline and cancellation are checked while waiting for the workers.
+        checkpoint_path: File to which the progress of the subset-size loop is appended,
+            so an interrupted enumeration can be resumed. Only for sequential generation.
+        resume: If True, continue from the progress stored in checkpoint_path instead
+            of starting over
+        checkpoint_every: Number of variants after which the next completed subset
+            triggers a checkpoint record
 
-            if dependency.type == ExistentialType.EQUIVALENCE:
-                if in_subset_src != in_subset_tgt:
-                    return False
-                continue
+    Returns:
+        The acceptance variants, in the order of iter_acceptance_variants
 
-            if not check_existential_relationship(
-                in_subset_src, in_subset_tgt, dependency.type, dependency.direction
-            ):
-                return False
-        
-        return True
-    
-    # Function to generate valid variants using topological sorting principles
-    def generate_valid_permutations(subset_bitset: int) -> List[List[int]]:
-        """
-        Generates valid permutations based on temporal constraints.
-        Uses a modified topological sort approach that respects direct and eventual constraints.
-        """
-        # Convert bitset to list of activity indices
-        subset_indices = [i for i in range(len(activities)) if subset_bitset & (1 << i)]
-        if not subset_indices:
-            return [[]]
-            
-        # If only one activity, no need for permutation checks
-        if len(subset_indices) == 1:
-            return [subset_indices]
-        
-        # For small subsets, we can still use permutations efficiently
-        if len(subset_indices) <= 3:
-            all_perms = list(permutations(subset_indices))
-            valid_perms = []
-            
-            for perm in all_perms:
-                if is_valid_permutation(list(perm)):
-                    valid_perms.append(list(perm))
-            
-            return valid_perms
-        
-        # For larger subsets, use a more optimized approach
-        valid_perms = []
-        
-        # Use a recursive backtracking approach to generate valid permutations
-        def backtrack(remaining: Set[int], current_path: List[int]):
-            if not remaining:
-                valid_perms.append(current_path.copy())
-                return
-                
-            for next_idx in list(remaining):
-                # Check if adding next_idx violates any direct constraints with the current path
-                if not can_add_to_path(current_path, next_idx):
+    Raises:
+        BudgetExceeded: If the budget is exceeded; it carries the variants generated so far
+        ValueError: If checkpointing is combined with workers, or the checkpoint
+            belongs to a different matrix
+    """
+    orderings = None
+    if checkpoint_path is not None:
+        if workers and workers > 1:
+            raise ValueError("Checkpointing is only supported for sequential generation")
+        compiled = compile_constraints(adj_matrix)
+        activities = compiled.activities
+        orderings = _iter_checkpointed_orderings(compiled, checkpoint_path, resume, checkpoint_every, budget)
+        variants = ([activities[idx] for idx in ordering] for ordering in orderings)
+        if budget is not None:
+            variants = budget.enforce(variants)
+    elif not workers or workers <= 1:
+        variants = iter_acceptance_variants(adj_matrix, budget)
+    else:
+        variants = _iter_parallel_variants(compile_constraints(adj_matrix), workers, budget)
+        if budget is not None:
+            variants = budget.enforce(variants)
+
+    acceptance_variants = []
+    try:
+        for variant in variants:
+            acceptance_variants.append(variant)
+    except BudgetExceeded as e:
+        e.partial_variants = acceptance_variants
+        raise
+    finally:
+        # Writes the pending checkpoint record now; the traceback of an exception
+        # would otherwise keep the generator, and its open writer, alive
+        if orderings is not None:
+            orderings.close()
+    return acceptance_variants
+
+
+def _iter_checkpointed_orderings(
+    compiled: CompiledConstraints,
+    path: str,
+    resume: bool,
+    checkpoint_every: int,
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[List[int]]:
+    """
+    Yields the orderings of iter_compiled_orderings while appending them to a checkpoint.
+
+    Records are only written at subset boundaries, also when the consumer stops or
+    an exception interrupts the enumeration, so a resumed run never repeats or
+    skips an ordering.
+    """
+    fingerprint = compiled.fingerprint()
+    state = load_checkpoint(path, fingerprint) if resume else None
+    if state is not None:
+        yield from state.orderings
+        if state.complete:
+            return
+    start_size, start_cursor = (state.size, state.cursor) if state is not None else (0, 0)
+
+    feasibility = OrderingFeasibility(compiled)
+    with CheckpointWriter(path, fingerprint, append=state is not None) as writer:
+        pending: List[List[int]] = []
+        position = (start_size, start_cursor)
+        size, cursor = start_size, 0
+        try:
+            for subset_bitset in iter_subsets_by_size(compiled, budget, start_size):
+                subset_size = bin(subset_bitset).count("1")
+                if subset_size != size:
+                    size, cursor = subset_size, 0
+                cursor += 1
+                if size == start_size and cursor <= start_cursor:
                     continue
-                    
-                current_path.append(next_idx)
-                remaining.remove(next_idx)
-                
-                backtrack(remaining, current_path)
-                
-                remaining.add(next_idx)
-                current_path.pop()
-        
-        backtrack(set(subset_indices), [])
-        return valid_perms
-    
-    def can_add_to_path(current_path: List[int], next_idx: int) -> bool:
-        """
-        Checks if adding next_idx to the current path violates any direct temporal constraints.
-        """
-        if not current_path:
-            return True
+                if budget is not None:
+                    budget.check()
+                subset_orderings = []
+                if feasibility.is_orderable(subset_bitset):
+                    for ordering in iter_subset_orderings(compiled, subset_bitset):
+                        subset_orderings.append(ordering)
+                        yield ordering
+                pending.extend(subset_orderings)
+                position = (size, cursor)
+                if len(pending) >= checkpoint_every:
+                    writer.record(*position, pending)
+                    pending = []
+        finally:
+            if pending:
+                writer.record(*position, pending)
+        writer.complete()
 
-        next_direct = direct_constraints.get(next_idx, set())
-        next_reverse_direct = reverse_direct_constraints.get(next_idx, set())
 
-        for idx in current_path:
-            idx_direct = direct_constraints.get(idx, set())
-            idx_reverse_direct = reverse_direct_constraints.get(idx, set())
+def _iter_parallel_variants(
+    compiled: CompiledConstraints, workers: int, budget: Optional[GenerationBudget]
+) -> Iterator[List[str]]:
+    """
+    Yields the variants of iter_compiled_orderings, searched in a process pool.
 
-            # If there's a direct constraint from next_idx -> idx, it's invalid
-            if idx in next_direct:
-                return False
+    The search is split into tasks of known cost (see _parallel_tasks), which are
+    packed into PARALLEL_CHUNKS_PER_WORKER chunks per worker of about equal cost.
+    Chunks finish in any order; their results are buffered and yielded in task
+    order. Every finished chunk is counted against the budget immediately, also
+    if it has to wait for an earlier one. Once a limit is hit or the consumer
+    stops, the chunks that have not started are cancelled.
+    """
+    chunk_count = workers * PARALLEL_CHUNKS_PER_WORKER
+    tasks = _parallel_tasks(compiled, chunk_count, budget)
+    # A cancellation token cannot be shared with other processes
+    worker_budget = replace(budget, cancellation=None) if budget is not None else None
 
-            # If there's a direct constraint from idx -> next_idx where idx is not the last element
-            if next_idx in idx_direct and idx != current_path[-1]:
-                return False
+    activities = compiled.activities
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunks = {}
+        for chunk in _pack_tasks([cost for _, _, cost in tasks], chunk_count):
+            chunk_tasks = [tasks[position][:2] for position in chunk]
+            chunks[executor.submit(_orderings_of_tasks, compiled, chunk_tasks, worker_budget)] = chunk
+        pending = set(chunks)
+        finished: Dict[int, List[Tuple[int, ...]]] = {}
+        next_position = 0
+        variants_generated = 0
+        memory_estimate = 0
+        while pending:
+            done, pending = wait(pending, timeout=PARALLEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                for position, orderings in zip(chunks[future], future.result()):
+                    finished[position] = orderings
+                    variants_generated += len(orderings)
+                    memory_estimate += sum(estimate_variant_bytes(len(ordering)) for ordering in orderings)
+            if budget is not None:
+                budget.check(variants_generated, memory_estimate)
+            while next_position in finished:
+                if budget is not None:
+                    budget.check(variants_generated, memory_estimate)
+                for ordering in finished.pop(next_position):
+                    yield [activities[idx] for idx in ordering]
+                next_position += 1
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
 
-            # Check reverse direct constraints
-            if idx in next_reverse_direct:
-                return False
 
-            if next_idx in idx_reverse_direct and idx != current_path[-1]:
-                return False
+def _parallel_tasks(
+    compiled: CompiledConstraints, chunk_count: int, budget: Optional[GenerationBudget]
+) -> List[Tuple[int, Optional[int], int]]:
+    """
+    Splits the search into (subset, first chain, number of orderings) tasks, in output order.
 
-        return True
-    
-    def is_valid_permutation(perm: List[int]) -> bool:
-        """
-        Performs a final validation of a permutation against all temporal constraints.
-        """
-        idx_to_pos = {idx: pos for pos, idx in enumerate(perm)}
-        
-        for (src, tgt), dep in temporal_deps.items():
-            if dep.type == TemporalType.INDEPENDENCE:
-                continue
-                
-            src_idx = activity_to_idx[src]
-            tgt_idx = activity_to_idx[tgt]
-            
-            # Skip if either activity is not in the permutation
-            if src_idx not in idx_to_pos or tgt_idx not in idx_to_pos:
+    The orderings of every existentially valid subset are counted exactly, and
+    subsets without any are left out. A subset with more than a chunk's share of
+    all orderings is split by the chain its orderings start with, so that the
+    largest subsets are spread over several workers as well.
+    """
+    count_orderings = ordering_counter(compiled)
+    counted = []
+    for subset_bitset in iter_subsets_by_size(compiled, budget):
+        if budget is not None:
+            budget.check()
+        cost = count_orderings(subset_bitset, -1)
+        if cost:
+            counted.append((subset_bitset, cost))
+    share = sum(cost for _, cost in counted) // chunk_count
+
+    must_precede = compiled.must_precede
+    tasks: List[Tuple[int, Optional[int], int]] = []
+    for subset_bitset, cost in counted:
+        if cost <= share:
+            tasks.append((subset_bitset, None, cost))
+            continue
+        for chain_idx, chain in enumerate(contract_direct_chains(compiled, subset_bitset)):
+            chain_mask = 0
+            for idx in chain:
+                chain_mask |= 1 << idx
+            rest = subset_bitset & ~chain_mask
+            # The chain can only come first if nothing else has to precede it
+            if any(must_precede[idx] & rest for idx in chain):
                 continue
-                
-            pos_src = idx_to_pos[src_idx]
-            pos_tgt = idx_to_pos[tgt_idx]
-            
-            if not check_temporal_relationship(
-                pos_src, pos_tgt, dep.type, dep.direction
-            ):
-                return False
-                
-        return True
-    
-    # Main generation algorithm
-    acceptance_variants = []
-    n = len(activities)
+            chain_cost = count_orderings(rest, -1)
+            if chain_cost:
+                tasks.append((subset_bitset, chain_idx, chain_cost))
+    return tasks
+
+
+def _pack_tasks(costs: List[int], chunk_count: int) -> List[List[int]]:
+    """
+    Distributes task positions over at most chunk_count chunks of about equal total cost.
+
+    The most costly task goes first into the currently cheapest chunk; each chunk
+    lists its positions in increasing order.
+    """
+    loads = [(0, chunk_idx) for chunk_idx in range(min(chunk_count, len(costs)))]
+    chunks: List[List[int]] = [[] for _ in loads]
+    for position in sorted(range(len(costs)), key=lambda position: -costs[position]):
+        load, chunk_idx = heapq.heappop(loads)
+        chunks[chunk_idx].append(position)
+        heapq.heappush(loads, (load + costs[position], chunk_idx))
+    for chunk in chunks:
+        chunk.sort()
+    return chunks
+
+
+def iter_acceptance_variants(
+    adj_matrix: AdjacencyMatrix, budget: Optional[GenerationBudget] = None, factored: bool = False
+) -> Iterator[List[str]]:
+    """
+    Lazily yields all valid acceptance variants from an adjacency matrix.
+
+    Each variant is yielded as soon as the backtracking search finds it, so
+    consumers that only read the variants once never hold the full set in memory.
+    If a budget is given, it is checked before every variant and BudgetExceeded
+    is raised from the iterator once a limit is hit.
+
+    With factored=True, the activities are split into components that share no
+    dependency, and each component is searched on its own (see
+    factored_variants.iter_factored_variants). The component with the most
+    activities is streamed and the variants of the others are held in memory;
+    every streamed variant is followed by its interleavings with all choices of
+    the held ones. They are the same variants, but not in the order of the joint
+    search, so this is meant for consumers that do not depend on the order, such
+    as variants_to_matrix. With a single component it is the joint search.
     
-    # Define nested function for processing subsets of each size
-    def process_subsets_of_size(size):
-        if size == 0:
-            if satisfies_existential_constraints_cached(0):
-                acceptance_variants.append([])
+    Optimizations:
+    1. Enumerates only existentially valid subsets via the implication graph of the existential constraints
+    2. Compiles temporal constraints into per-activity bitmasks once per matrix
+    3. Contracts chains of DIRECT dependencies into macro-activities before permuting
+    4. Enforces all temporal constraints while the path is built, so every emitted variant is final
+    5. Skips subsets without any valid ordering before searching them, pruning supersets of infeasible cores
+    6. Uses bitwise operations for faster subset generation and validation
+    """
+    # Temporal dependencies compiled once into per-activity bitmasks
+    compiled = compile_constraints(adj_matrix)
+    if factored:
+        variants = _iter_factored_variants(compiled, budget)
+    else:
+        variants = iter_compiled_variants(compiled, get_default_cache(), budget)
+    if budget is None:
+        return variants
+    return budget.enforce(variants)
+
+
+def _iter_factored_variants(
+    compiled: CompiledConstraints, budget: Optional[GenerationBudget]
+) -> Iterator[List[str]]:
+    # Imported here, since factored_variants builds on this module
+    from factored_variants import iter_factored_variants
+
+    yield from iter_factored_variants(compiled, get_default_cache(), budget)
+
+
+def build_variant_trie(
+    adj_matrix: AdjacencyMatrix, budget: Optional[GenerationBudget] = None
+) -> VariantTrie:
+    """
+    Generates all valid acceptance variants of an adjacency matrix into a VariantTrie.
+
+    Each ordering found by the search is added as activity indices, so no list
+    of activity names is created per variant; prefixes shared between orderings
+    are stored once.
+
+    Args:
+        adj_matrix: The adjacency matrix to generate the variants for
+        budget: Limits for the generation
+
+    Returns:
+        A trie containing exactly the variants of iter_acceptance_variants, encoded
+        over the activities of the matrix
+
+    Raises:
+        BudgetExceeded: If the budget is exceeded
+    """
+    compiled = compile_constraints(adj_matrix)
+    trie = VariantTrie(compiled.activities)
+    orderings = iter_cached_orderings(compiled, get_default_cache(), budget)
+    if budget is not None:
+        orderings = budget.enforce(orderings)
+    for ordering in orderings:
+        trie.add_indices(ordering)
+    return trie
+
+
+def build_variant_set(
+    adj_matrix: AdjacencyMatrix, budget: Optional[GenerationBudget] = None
+) -> VariantSet:
+    """
+    Generates all valid acceptance variants of an adjacency matrix into a VariantSet.
+
+    The orderings found by the search are appended as activity indices, so no
+    list of activity names is created per variant.
+
+    Args:
+        adj_matrix: The adjacency matrix to generate the variants for
+        budget: Limits for the generation
+
+    Returns:
+        The variants in the order of iter_acceptance_variants, encoded over the
+        activities of the matrix
+
+    Raises:
+        BudgetExceeded: If the budget is exceeded
+    """
+    compiled = compile_constraints(adj_matrix)
+    variant_set = VariantSet(compiled.activities)
+    orderings = iter_cached_orderings(compiled, get_default_cache(), budget)
+    if budget is not None:
+        orderings = budget.enforce(orderings)
+    for ordering in orderings:
+        variant_set.append_indices(ordering)
+    return variant_set
+
+
+def iter_compiled_variants(
+    compiled: CompiledConstraints,
+    cache: Optional[VariantCache] = None,
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[List[str]]:
+    """
+    Lazily yields all valid acceptance variants of already compiled constraints.
+    """
+    activities = compiled.activities
+    for ordering in iter_cached_orderings(compiled, cache, budget):
+        yield [activities[idx] for idx in ordering]
+
+
+def iter_cached_orderings(
+    compiled: CompiledConstraints,
+    cache: Optional[VariantCache],
+    budget: Optional[GenerationBudget] = None,
+) -> Iterator[Sequence[int]]:
+    """
+    Yields the orderings of iter_compiled_orderings, served from a cache if possible.
+
+    On a cache hit the stored orderings are replayed without searching. On a miss
+    the search runs as usual while its orderings are recorded compactly, and they
+    are stored once the consumer has read all of them. Recording stops as soon as
+    the entry outgrows the cache, which would reject it anyway.
+    """
+    if cache is None:
+        yield from iter_compiled_orderings(compiled, budget)
+        return
+
+    key = variant_cache_key(compiled)
+    cached = cache.get(key)
+    if cached is not None:
+        for position in range(len(cached)):
+            yield cached.variant_indices(position)
+        return
+
+    recorded = VariantSet(compiled.activities)
+    for ordering in iter_compiled_orderings(compiled, budget):
+        if recorded is not None:
+            recorded.append_indices(ordering)
+            if recorded.nbytes > cache.max_bytes:
+                recorded = None
+        yield ordering
+    if recorded is not None:
+        cache.put(key, recorded)
+
+
+def variant_cache_key(compiled: CompiledConstraints) -> str:
+    """
+    Returns the key under which the variants of compiled constraints are cached.
+
+    It combines the fingerprint of the constraints with ENGINE_VERSION.
+    """
+    return f"{compiled.fingerprint()}-engine{ENGINE_VERSION}"
+
+
+def iter_compiled_orderings(
+    compiled: CompiledConstraints, budget: Optional[GenerationBudget] = None
+) -> Iterator[List[int]]:
+    """
+    Lazily yields all valid acceptance variants as lists of activity indices.
+
+    If a budget is given, its deadline and cancellation are checked for every
+    subset, including the subsets without any valid ordering.
+    """
+    feasibility = OrderingFeasibility(compiled)
+
+    # Existentially valid subsets in increasing size, in combination order
+    for subset_bitset in iter_subsets_by_size(compiled, budget):
+        if budget is not None:
+            budget.check()
+        if not feasibility.is_orderable(subset_bitset):
+            continue
+        yield from iter_subset_orderings(compiled, subset_bitset)
+
+
+def iter_subset_orderings(
+    compiled: CompiledConstraints, subset_bitset: int, first_chain: Optional[int] = None
+) -> Iterator[List[int]]:
+    """
+    Generates the valid permutations of a subset based on temporal constraints.
+
+    Chains of DIRECT dependencies are contracted into macro-activities first, so
+    the backtracking only permutes the chains and expands each one in place.
+    Chains are tried in the order of their first activity, which yields the
+    permutations in lexicographic order.
+
+    Args:
+        compiled: The compiled constraints of the matrix
+        subset_bitset: The activities to order
+        first_chain: If given, only the orderings that start with this chain, as
+            an index into contract_direct_chains(compiled, subset_bitset)
+
+    Returns:
+        An iterator over the valid orderings as lists of activity indices
+    """
+    chains = contract_direct_chains(compiled, subset_bitset)
+    if chains is None:
+        return
+
+    must_precede = compiled.must_precede
+    chain_masks = []
+    chain_precede = []
+    for chain in chains:
+        chain_mask = 0
+        precede = 0
+        for idx in chain:
+            chain_mask |= 1 << idx
+            precede |= must_precede[idx]
+        chain_masks.append(chain_mask)
+        chain_precede.append(precede & ~chain_mask)
+
+    def backtrack(remaining: int, remaining_chains: int, current_path: List[int]) -> Iterator[List[int]]:
+        if not remaining_chains:
+            yield current_path.copy()
             return
 
-        if size == 1:
-            # Single-element subsets are handled directly
-            for i in range(n):
-                subset_bitset = 1 << i
-                if satisfies_existential_constraints_cached(subset_bitset):
-                    acceptance_variants.append([activities[i]])
+        candidates = remaining_chains
+        while candidates:
+            chain_bit = candidates & -candidates
+            candidates ^= chain_bit
+            chain_idx = chain_bit.bit_length() - 1
+
+            # A chain can be placed once nothing it has to follow is left
+            if chain_precede[chain_idx] & remaining:
+                continue
+
+            current_path.extend(chains[chain_idx])
+
+            yield from backtrack(
+                remaining & ~chain_masks[chain_idx], remaining_chains ^ chain_bit, current_path
+            )
+
+            del current_path[-len(chains[chain_idx]):]
+
+    if first_chain is None:
+        yield from backtrack(subset_bitset, (1 << len(chains)) - 1, [])
+    elif not chain_precede[first_chain] & subset_bitset:
+        yield from backtrack(
+            subset_bitset & ~chain_masks[first_chain],
+            ((1 << len(chains)) - 1) ^ (1 << first_chain),
+            list(chains[first_chain]),
+        )
+
+
+def _orderings_of_tasks(
+    compiled: CompiledConstraints,
+    tasks: List[Tuple[int, Optional[int]]],
+    budget: Optional[GenerationBudget] = None,
+) -> List[List[Tuple[int, ...]]]:
+    """
+    Worker task: the orderings of each (subset, first chain) task, as tuples of activity indices.
+    """
+    results = []
+    variants_generated = 0
+    memory_estimate = 0
+    for subset_bitset, first_chain in tasks:
+        if budget is not None:
+            budget.check(variants_generated, memory_estimate)
+        orderings = []
+        for ordering in iter_subset_orderings(compiled, subset_bitset, first_chain):
+            orderings.append(tuple(ordering))
+            if budget is not None:
+                variants_generated += 1
+                memory_estimate += estimate_variant_bytes(len(ordering))
+                budget.check(variants_generated, memory_estimate)
+        results.append(orderings)
+    return results
+
+
+def count_acceptance_variants(adj_matrix: AdjacencyMatrix) -> int:
+    """
+    Counts the valid acceptance variants of an adjacency matrix without enumerating them.
+
+    The activities are split into groups without dependencies between each other.
+    Each group is counted separately per number of blocks, and the groups are
+    combined by counting all interleavings of their blocks.
+
+    Returns:
+        The exact number of acceptance variants, including the empty variant if it is valid
+    """
+    compiled = compile_constraints(adj_matrix)
+    return count_interleavings([
+        count_variants_by_blocks(restrict_constraints(compiled, component))
+        for component in dependency_components(compiled)
+    ])
+
+
+def count_variants_by_blocks(compiled: CompiledConstraints) -> List[int]:
+    """
+    Counts the valid acceptance variants of compiled constraints per number of blocks.
+
+    A block is a chain of DIRECT dependencies, which has to stay contiguous even
+    when the variant is interleaved with variants of independent activities. All
+    valid orderings of a subset consist of the same blocks.
+
+    Returns:
+        Entry k is the exact number of valid variants made of k blocks
+    """
+    direct_successor = compiled.direct_successor
+    count_orderings = ordering_counter(compiled)
+    feasibility = OrderingFeasibility(compiled)
+    counts = [0] * (len(compiled.activities) + 1)
+    for subset_bitset in iter_existential_subsets(compiled):
+        if not feasibility.is_orderable(subset_bitset):
+            continue
+        blocks = 0
+        remaining = subset_bitset
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            # Activities with a direct successor in the subset extend a block
+            if not direct_successor[bit.bit_length() - 1] & subset_bitset:
+                blocks += 1
+        counts[blocks] += count_orderings(subset_bitset, -1)
+    return counts
+
+
+def ordering_counter(compiled: CompiledConstraints) -> Callable[[int, int], int]:
+    """
+    Creates a memoized counter for the valid orderings of sets of activities.
+
+    Uses dynamic programming over subsets: the number of valid orderings of the
+    activities that are still to be placed only depends on that remaining set and,
+    if it has a pending direct successor, on the last placed activity. These states
+    are shared between all subsets counted with the same counter.
+
+    Returns:
+        count_orderings(remaining, last), where last is the index of the last placed
+        activity if it still waits for its direct successor and -1 otherwise
+    """
+    must_precede = compiled.must_precede
+    direct_successor = compiled.direct_successor
+    memo: Dict[Tuple[int, int], int] = {}
+
+    def count_orderings(remaining: int, last: int) -> int:
+        if not remaining:
+            return 1
+        key = (remaining, last)
+        if key in memo:
+            return memo[key]
+
+        total = 0
+        for _, rest, next_last in _placement_options(must_precede, direct_successor, remaining, last):
+            total += count_orderings(rest, next_last)
+
+        memo[key] = total
+        return total
+
+    return count_orderings
+
+
+def _placement_options(
+    must_precede: Tuple[int, ...], direct_successor: Tuple[int, ...], remaining: int, last: int
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yields (activity, rest, next_last) for every activity that may be placed next, in index order.
+    """
+    candidates = remaining
+    if last >= 0:
+        candidates = direct_successor[last] & remaining
+        if candidates & (candidates - 1):
+            # Two activities would both have to directly follow the last one
             return
-            
-        def generate_combinations(start_idx, remaining_size, current_bitset):
-            if remaining_size == 0:
-                if satisfies_existential_constraints_cached(current_bitset):
-                    for valid_perm_indices in generate_valid_permutations(current_bitset):
-                        valid_perm = [idx_to_activity[idx] for idx in valid_perm_indices]
-                        acceptance_variants.append(valid_perm)
-                return
-                
-            for i in range(start_idx, n - remaining_size + 1):
-                generate_combinations(i + 1, remaining_size - 1, current_bitset | (1 << i))
-                
-        generate_combinations(0, size, 0)
-    
-    # Use a custom loop to process subsets in increasing size
-    # This helps with memoization and pruning
-    for size in range(0, n + 1):
-        # Process subsets of each size separately to improve locality
-        process_subsets_of_size(size)
 
-    copy_variants = acceptance_variants.copy()
-    for variant in copy_variants:
-        if not satisfies_temporal_constraints(variant, temporal_deps):
-            acceptance_variants.remove(variant)
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        idx = bit.bit_length() - 1
+        if must_precede[idx] & remaining:
+            continue
+        rest = remaining ^ bit
+        yield idx, rest, idx if direct_successor[idx] & rest else -1
 
-    return acceptance_variants
+
+def sample_acceptance_variants(
+    adj_matrix: AdjacencyMatrix, k: int, seed: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Draws acceptance variants uniformly at random, with replacement, without enumerating them.
+
+    Every existentially valid subset is weighted by its exact number of valid
+    orderings. A sample picks a subset with probability proportional to its weight
+    and then builds the ordering one activity at a time, choosing each next
+    activity with probability proportional to the number of orderings it leaves.
+    Counting is done once per matrix; each sample then costs O(n) count lookups.
+
+    Args:
+        adj_matrix: The adjacency matrix to sample the variants of
+        k: The number of variants to draw
+        seed: Seed for the random number generator, for reproducible samples
+
+    Returns:
+        k variants, each drawn uniformly from the variants of
+        generate_optimized_acceptance_variants
+
+    Raises:
+        ValueError: If k is negative or the matrix has no acceptance variant
+    """
+    if k < 0:
+        raise ValueError(f"Number of samples must not be negative, got {k}")
+
+    compiled = compile_constraints(adj_matrix)
+    must_precede = compiled.must_precede
+    direct_successor = compiled.direct_successor
+    count_orderings = ordering_counter(compiled)
+
+    subsets = []
+    cumulative = []
+    total = 0
+    for subset_bitset in iter_existential_subsets(compiled):
+        count = count_orderings(subset_bitset, -1)
+        if count:
+            total += count
+            subsets.append(subset_bitset)
+            cumulative.append(total)
+    if not total:
+        raise ValueError("The matrix has no acceptance variant to sample from")
+
+    rng = Random(seed)
+    activities = compiled.activities
+    samples = []
+    for _ in range(k):
+        target = rng.randrange(total)
+        position = bisect_right(cumulative, target)
+        # The offset of the target within the chosen subset selects one of its orderings
+        target -= cumulative[position - 1] if position else 0
+
+        remaining, last = subsets[position], -1
+        variant = []
+        while remaining:
+            for idx, rest, next_last in _placement_options(must_precede, direct_successor, remaining, last):
+                count = count_orderings(rest, next_last)
+                if target < count:
+                    break
+                target -= count
+            variant.append(activities[idx])
+            remaining, last = rest, next_last
+        samples.append(variant)
+    return samples
+
+
+def count_interleavings(counts_by_blocks: List[List[int]]) -> int:
+    """
+    Counts the variants obtained by choosing one variant per independent group and interleaving their blocks.
+
+    Args:
+        counts_by_blocks: Per group, entry k is the number of its variants made of k blocks
+
+    Returns:
+        The exact number of combined variants
+    """
+    combined = [1]
+    for group_counts in counts_by_blocks:
+        merged = [0] * (len(combined) + len(group_counts) - 1)
+        for length, count in enumerate(combined):
+            if not count:
+                continue
+            for group_length, group_count in enumerate(group_counts):
+                if group_count:
+                    # Positions of the group's blocks among all combined blocks
+                    merged[length + group_length] += (
+                        count * group_count * comb(length + group_length, group_length)
+                    )
+        combined = merged
+    return sum(combined)
@@ -9,7 +9,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import and run the Flask app
-from app import app
+from app import app, configure_variant_cache
 
 if __name__ == "__main__":
     print("Starting Business Process Redesign Tool...")
@@ -17,4 +17,5 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
     
+    configure_variant_cache()
     app.run(debug=True, host='127.0.0.1', port=5000) 
\ No newline at end of file
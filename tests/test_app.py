@@ -1,14 +1,39 @@
 import pytest
-from app import app as flask_app
+from app import app as flask_app, configure_variant_cache
+from variant_cache import VariantCache, get_default_cache, set_default_cache
 
 
 @pytest.fixture
-def client():
+def client(tmp_path):
+    previous = get_default_cache()
+    set_default_cache(VariantCache(str(tmp_path / "variant_cache")))
     with flask_app.test_client() as client:
         yield client
+    set_default_cache(previous)
 
 
 def test_home(client):
     response = client.get("/")
     assert response.status_code == 200
 
+
+
+def test_variant_cache_is_created_from_app_config(tmp_path, monkeypatch):
+    directory = str(tmp_path / "configured_cache")
+    monkeypatch.setitem(flask_app.config, "VARIANT_CACHE_DIR", directory)
+    monkeypatch.setitem(flask_app.config, "VARIANT_CACHE_MAX_BYTES", 1024)
+
+    configure_variant_cache()
+
+    assert get_default_cache().directory == directory
+    assert get_default_cache().max_bytes == 1024
+
+
+def test_change_fails_when_variant_budget_is_exceeded(client, monkeypatch):
+    monkeypatch.setitem(flask_app.config, "VARIANT_MAX_COUNT", 2)
+    client.post("/api/process", json={"traces": [["a", "b", "c"], ["a", "c", "b"]]})
+
+    response = client.post("/api/change", data={"operation": "delete", "activity": "a"})
+
+    assert response.get_json()["success"] is False
+    assert "Variant generation stopped" in response.get_json()["error"]
@@ -0,0 +1,110 @@
+from adjacency_matrix import AdjacencyMatrix
+from dependencies import (
+    TemporalType,
+    ExistentialType,
+    TemporalDependency,
+    ExistentialDependency,
+    Direction,
+)
+from compiled_constraints import OrderingFeasibility, compile_constraints, contract_direct_chains
+
+
+def test_compile_temporal_masks():
+    matrix = AdjacencyMatrix(activities=["A", "B", "C", "D"])
+    matrix.add_dependency(
+        "A", "B", TemporalDependency(TemporalType.DIRECT, Direction.FORWARD), None
+    )
+    matrix.add_dependency(
+        "C", "B", TemporalDependency(TemporalType.EVENTUAL, Direction.BACKWARD), None
+    )
+    matrix.add_dependency(
+        "D", "A", TemporalDependency(TemporalType.INDEPENDENCE, Direction.BOTH), None
+    )
+    compiled = compile_constraints(matrix)
+
+    # A <_d B, B < C
+    assert compiled.must_precede == (0b0000, 0b0001, 0b0010, 0b0000)
+    assert compiled.must_follow == (0b0010, 0b0100, 0b0000, 0b0000)
+    assert compiled.direct_predecessor == (0b0000, 0b0001, 0b0000, 0b0000)
+    assert compiled.direct_successor == (0b0010, 0b0000, 0b0000, 0b0000)
+
+
+def test_compile_ignores_temporal_self_dependencies():
+    matrix = AdjacencyMatrix(activities=["A"])
+    matrix.add_dependency(
+        "A",
+        "A",
+        TemporalDependency(TemporalType.DIRECT, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.INDEPENDENCE, Direction.BOTH),
+    )
+    compiled = compile_constraints(matrix)
+
+    assert compiled.must_precede == (0,)
+    assert compiled.direct_successor == (0,)
+    assert compiled.existential == ()
+
+
+def _direct_matrix(activities, pairs):
+    matrix = AdjacencyMatrix(activities=activities)
+    for source, target in pairs:
+        matrix.add_dependency(
+            source, target, TemporalDependency(TemporalType.DIRECT, Direction.FORWARD), None
+        )
+    return matrix
+
+
+def test_contract_direct_chains():
+    compiled = compile_constraints(
+        _direct_matrix(["A", "B", "C", "D", "E"], [("C", "A"), ("A", "D")])
+    )
+
+    assert contract_direct_chains(compiled, 0b11111) == [(1,), (2, 0, 3), (4,)]
+    # Without A the chain breaks apart
+    assert contract_direct_chains(compiled, 0b11110) == [(1,), (2,), (3,), (4,)]
+    assert contract_direct_chains(compiled, 0) == []
+
+
+def test_contract_direct_chains_detects_contradictions():
+    branching = compile_constraints(_direct_matrix(["A", "B", "C"], [("A", "B"), ("A", "C")]))
+    cycle = compile_constraints(_direct_matrix(["A", "B"], [("A", "B"), ("B", "A")]))
+
+    assert contract_direct_chains(branching, 0b111) is None
+    assert contract_direct_chains(branching, 0b011) == [(0, 1)]
+    assert contract_direct_chains(cycle, 0b11) is None
+
+    reversed_chain = _direct_matrix(["A", "B", "C"], [("A", "B"), ("B", "C")])
+    reversed_chain.add_dependency(
+        "C", "A", TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD), None
+    )
+    assert contract_direct_chains(compile_constraints(reversed_chain), 0b111) is None
+
+
+def test_ordering_feasibility_detects_cycle_between_chains():
+    matrix = _direct_matrix(["A", "B", "C", "D"], [("A", "B")])
+    # C has to come after A but before B, which would split the chain A B
+    matrix.add_dependency(
+        "A", "C", TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD), None
+    )
+    matrix.add_dependency(
+        "C", "B", TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD), None
+    )
+    feasibility = OrderingFeasibility(compile_constraints(matrix))
+
+    assert feasibility.is_orderable(0b0011)
+    assert feasibility.is_orderable(0b0101)
+    assert not feasibility.is_orderable(0b0111)
+    # Supersets of the infeasible core are rejected as well
+    assert not feasibility.is_orderable(0b1111)
+    assert feasibility._infeasible_cores == [0b0111]
+
+
+def test_fingerprint_identifies_equivalent_constraints():
+    forward = _direct_matrix(["A", "B", "C"], [("A", "B")])
+    both = AdjacencyMatrix(activities=["A", "B", "C"])
+    both.add_dependency(
+        "A", "B", TemporalDependency(TemporalType.DIRECT, Direction.BOTH), None
+    )
+    other = _direct_matrix(["A", "B", "C"], [("B", "C")])
+
+    assert compile_constraints(forward).fingerprint() == compile_constraints(both).fingerprint()
+    assert compile_constraints(forward).fingerprint() != compile_constraints(other).fingerprint()
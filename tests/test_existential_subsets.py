@@ -0,0 +1,222 @@
+import pytest
+import existential_subsets
+from adjacency_matrix import AdjacencyMatrix, parse_yaml_to_adjacency_matrix
+from dependencies import ExistentialType, ExistentialDependency, Direction
+from compiled_constraints import compile_constraints
+from existential_subsets import (
+    ForcedActivities,
+    equivalence_classes,
+    find_forced_activities,
+    iter_existential_subsets,
+    iter_matching_subsets,
+    iter_subsets_by_size,
+    vectorized_valid_subsets,
+)
+
+
+def _matrix(activities, existential_deps):
+    matrix = AdjacencyMatrix(activities=activities)
+    for (source, target), (dep_type, direction) in existential_deps.items():
+        matrix.add_dependency(
+            source, target, None, ExistentialDependency(dep_type, direction)
+        )
+    return matrix
+
+
+def _brute_force(compiled):
+    return {
+        subset_bitset
+        for subset_bitset in range(1 << len(compiled.activities))
+        if compiled.satisfies_existential(subset_bitset)
+    }
+
+
+@pytest.mark.parametrize(
+    "dep_type, direction",
+    [
+        (ExistentialType.IMPLICATION, Direction.FORWARD),
+        (ExistentialType.IMPLICATION, Direction.BACKWARD),
+        (ExistentialType.EQUIVALENCE, Direction.BOTH),
+        (ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH),
+        (ExistentialType.NAND, Direction.BOTH),
+        (ExistentialType.OR, Direction.BOTH),
+        (ExistentialType.INDEPENDENCE, Direction.BOTH),
+    ],
+)
+def test_single_dependency_matches_brute_force(dep_type, direction):
+    compiled = compile_constraints(
+        _matrix(["A", "B", "C"], {("A", "B"): (dep_type, direction)})
+    )
+    subsets = list(iter_existential_subsets(compiled))
+
+    assert len(subsets) == len(set(subsets))
+    assert set(subsets) == _brute_force(compiled)
+
+
+def test_chained_dependencies_match_brute_force():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B", "C", "D", "E"],
+            {
+                ("A", "B"): (ExistentialType.IMPLICATION, Direction.FORWARD),
+                ("B", "C"): (ExistentialType.NAND, Direction.BOTH),
+                ("C", "D"): (ExistentialType.OR, Direction.BOTH),
+                ("D", "E"): (ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH),
+                ("E", "A"): (ExistentialType.IMPLICATION, Direction.BACKWARD),
+            },
+        )
+    )
+    assert set(iter_existential_subsets(compiled)) == _brute_force(compiled)
+
+
+def test_unsatisfiable_dependencies_yield_nothing():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B"],
+            {
+                ("A", "B"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("B", "A"): (ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH),
+            },
+        )
+    )
+    assert list(iter_existential_subsets(compiled)) == []
+
+
+def test_iter_subsets_by_size_uses_combination_order():
+    compiled = compile_constraints(parse_yaml_to_adjacency_matrix(
+        "sample-matrices/first_prototype.yaml"
+    ))
+    subsets = list(iter_subsets_by_size(compiled))
+
+    assert len(subsets) == len(set(subsets))
+    assert set(subsets) == _brute_force(compiled)
+    keys = [
+        (bin(subset_bitset).count("1"), [idx for idx in range(len(compiled.activities)) if subset_bitset >> idx & 1])
+        for subset_bitset in subsets
+    ]
+    assert keys == sorted(keys)
+
+
+def test_equivalence_classes_group_linked_activities():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B", "C", "D", "E"],
+            {
+                ("A", "C"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("E", "C"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("B", "D"): (ExistentialType.IMPLICATION, Direction.FORWARD),
+            },
+        )
+    )
+    assert equivalence_classes(compiled) == [0b10101, 0b00010, 0b01000]
+    assert all(
+        subset_bitset & 0b10101 in (0, 0b10101)
+        for subset_bitset in iter_existential_subsets(compiled)
+    )
+    assert set(iter_existential_subsets(compiled)) == _brute_force(compiled)
+
+
+def test_negated_equivalence_inside_class_is_contradiction():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B", "C", "D"],
+            {
+                ("A", "B"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("B", "C"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("C", "A"): (ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH),
+            },
+        )
+    )
+    assert list(iter_existential_subsets(compiled)) == []
+
+
+def test_find_forced_activities_propagates_presence():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B", "C", "D"],
+            {
+                # B implies A and not B implies A, so A is always present
+                ("B", "A"): (ExistentialType.IMPLICATION, Direction.FORWARD),
+                ("A", "B"): (ExistentialType.OR, Direction.BOTH),
+                ("A", "C"): (ExistentialType.NAND, Direction.BOTH),
+                ("A", "D"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+            },
+        )
+    )
+    forced = find_forced_activities(compiled)
+
+    assert forced == ForcedActivities(present=("A", "D"), absent=("C",), contradiction=False)
+    assert all(
+        subset_bitset & 0b1101 == 0b1001
+        for subset_bitset in iter_existential_subsets(compiled)
+    )
+
+
+def test_find_forced_activities_flags_contradiction():
+    compiled = compile_constraints(
+        _matrix(
+            ["A", "B"],
+            {
+                ("A", "B"): (ExistentialType.EQUIVALENCE, Direction.BOTH),
+                ("B", "A"): (ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH),
+            },
+        )
+    )
+    assert find_forced_activities(compiled).contradiction
+
+
+def test_vectorized_valid_subsets_match_brute_force():
+    pytest.importorskip("numpy")
+    compiled = compile_constraints(parse_yaml_to_adjacency_matrix(
+        "sample-matrices/fixed_evaluation_matrix.yaml"
+    ))
+    assert set(vectorized_valid_subsets(compiled).tolist()) == set(
+        iter_existential_subsets(compiled)
+    )
+
+
+def test_dense_subset_space_uses_vectorized_order(monkeypatch):
+    pytest.importorskip("numpy")
+    compiled = compile_constraints(
+        _matrix(
+            [f"A{i}" for i in range(13)],
+            {("A0", "A1"): (ExistentialType.IMPLICATION, Direction.FORWARD)},
+        )
+    )
+    vectorized = list(iter_subsets_by_size(compiled))
+    monkeypatch.setattr(existential_subsets, "np", None)
+
+    assert vectorized == list(iter_subsets_by_size(compiled))
+
+
+def test_search_per_size_keeps_combination_order(monkeypatch):
+    compiled = compile_constraints(parse_yaml_to_adjacency_matrix(
+        "sample-matrices/first_prototype.yaml"
+    ))
+    expected = list(iter_subsets_by_size(compiled))
+    monkeypatch.setattr(existential_subsets, "VECTORIZED_MIN_SUBSETS", 2)
+    monkeypatch.setattr(existential_subsets, "np", None)
+
+    assert list(iter_subsets_by_size(compiled)) == expected
+    assert list(iter_subsets_by_size(compiled, min_size=3)) == [
+        subset_bitset for subset_bitset in expected if bin(subset_bitset).count("1") >= 3
+    ]
+
+
+def test_iter_matching_subsets_filters_and_deduplicates():
+    matrix = _matrix(
+        ["a", "b", "c", "d"],
+        {("a", "b"): (ExistentialType.IMPLICATION, Direction.FORWARD)},
+    )
+    compiled = compile_constraints(matrix)
+    a, b, c = (compiled.activities.index(activity) for activity in "abc")
+    conditions = [((a, True),), ((c, False), (b, True))]
+
+    matching = list(iter_matching_subsets(compiled, conditions))
+
+    expected = [
+        subset_bitset
+        for subset_bitset in iter_subsets_by_size(compiled)
+        if subset_bitset >> a & 1 or (not subset_bitset >> c & 1 and subset_bitset >> b & 1)
+    ]
+    assert matching == expected
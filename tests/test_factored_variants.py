@@ -0,0 +1,120 @@
+import sys
+from collections.abc import Sized
+import pytest
+import factored_variants
+from adjacency_matrix import AdjacencyMatrix, parse_yaml_to_adjacency_matrix
+from dependencies import (
+    TemporalType,
+    ExistentialType,
+    TemporalDependency,
+    ExistentialDependency,
+    Direction,
+)
+from optimized_acceptance_variants import generate_optimized_acceptance_variants, iter_acceptance_variants
+from factored_variants import factor_acceptance_variants
+from generation_budget import BudgetExceeded, GenerationBudget
+
+
+def _independent_groups_matrix():
+    adj = AdjacencyMatrix(activities=["A", "B", "C", "D", "E", "F"])
+    adj.add_dependency(
+        "A",
+        "B",
+        TemporalDependency(TemporalType.DIRECT, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.EQUIVALENCE, Direction.BOTH),
+    )
+    adj.add_dependency(
+        "C", "D", TemporalDependency(TemporalType.EVENTUAL, Direction.BACKWARD), None
+    )
+    adj.add_dependency(
+        "D",
+        "E",
+        None,
+        ExistentialDependency(ExistentialType.NAND, Direction.BOTH),
+    )
+    return adj
+
+
+def test_factored_variants_match_monolithic_enumeration():
+    adj = _independent_groups_matrix()
+    factored = factor_acceptance_variants(adj)
+    variants = [tuple(variant) for variant in factored]
+
+    assert [set(component) for component in factored.components] == [
+        {"A", "B"}, {"C", "D", "E"}, {"F"}
+    ]
+    assert len(variants) == len(set(variants))
+    assert set(variants) == {
+        tuple(variant) for variant in generate_optimized_acceptance_variants(adj)
+    }
+
+
+def test_direct_chains_are_never_split_by_other_components():
+    for variant in factor_acceptance_variants(_independent_groups_matrix()):
+        if "A" in variant:
+            assert variant[variant.index("A") + 1] == "B"
+
+
+def test_factored_count_matches_enumeration():
+    adj = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    factored = factor_acceptance_variants(adj)
+
+    assert factored.count() == len(list(factored))
+    assert factored.count() == len(generate_optimized_acceptance_variants(adj))
+
+
+def test_iter_acceptance_variants_factored_yields_same_variants():
+    adj = _independent_groups_matrix()
+    factored = [tuple(variant) for variant in iter_acceptance_variants(adj, factored=True)]
+
+    assert len(factored) == len(set(factored))
+    assert set(factored) == {tuple(variant) for variant in iter_acceptance_variants(adj)}
+
+
+def _or_chains_matrix(*lengths):
+    adj = AdjacencyMatrix(activities=[f"{chr(65 + chain)}{i}" for chain, length in enumerate(lengths) for i in range(length)])
+    for chain, length in enumerate(lengths):
+        for i in range(length - 1):
+            adj.add_dependency(
+                f"{chr(65 + chain)}{i}",
+                f"{chr(65 + chain)}{i + 1}",
+                None,
+                ExistentialDependency(ExistentialType.OR, Direction.BOTH),
+            )
+    return adj
+
+
+def test_factored_search_of_connected_matrix_streams_and_stops_at_limit():
+    adj = _or_chains_matrix(9)
+
+    variants = iter_acceptance_variants(adj, factored=True)
+    assert next(variants) == next(iter_acceptance_variants(adj))
+
+    with pytest.raises(BudgetExceeded) as exc_info:
+        for _ in iter_acceptance_variants(adj, GenerationBudget(max_variants=10), factored=True):
+            pass
+    assert exc_info.value.variants_generated == 11
+
+
+def test_factored_search_checks_limit_while_storing_components(monkeypatch):
+    adj = _or_chains_matrix(6, 7)
+    stored = []
+    iter_block_variants = factored_variants._iter_block_variants
+
+    def record(restricted, cache, budget):
+        for blocks in iter_block_variants(restricted, cache, budget):
+            stored.append(blocks)
+            yield blocks
+
+    monkeypatch.setattr(factored_variants, "_iter_block_variants", record)
+    with pytest.raises(BudgetExceeded):
+        next(iter_acceptance_variants(adj, GenerationBudget(max_variants=10), factored=True))
+    # Only the smaller component is stored, and only until it implies 11 variants
+    assert len(stored) == 11
+
+
+def test_factored_count_exceeds_index_size():
+    factored = factor_acceptance_variants(AdjacencyMatrix(activities=[f"A{i}" for i in range(21)]))
+
+    assert factored.count() > sys.maxsize
+    assert not isinstance(factored, Sized)
@@ -0,0 +1,136 @@
+import time
+import pytest
+from adjacency_matrix import AdjacencyMatrix
+from dependencies import (
+    TemporalDependency,
+    ExistentialDependency,
+    TemporalType,
+    ExistentialType,
+    Direction,
+)
+from generation_budget import BudgetExceeded, CancellationToken, GenerationBudget
+from compiled_constraints import compile_constraints
+from optimized_acceptance_variants import (
+    _iter_parallel_variants,
+    generate_optimized_acceptance_variants,
+    iter_acceptance_variants,
+)
+from change_operations.delete_operation import delete_activity
+from change_operations.modify_operation import modify_dependencies
+
+
+@pytest.fixture
+def unconstrained_matrix():
+    return AdjacencyMatrix(activities=["A", "B", "C", "D"])
+
+
+def test_max_variants_raises_with_partial_variants(unconstrained_matrix):
+    with pytest.raises(BudgetExceeded) as exc_info:
+        generate_optimized_acceptance_variants(
+            unconstrained_matrix, budget=GenerationBudget(max_variants=10)
+        )
+    assert exc_info.value.partial_variants == (
+        generate_optimized_acceptance_variants(unconstrained_matrix)[:10]
+    )
+    assert exc_info.value.variants_generated == 11
+
+
+def test_max_memory_raises(unconstrained_matrix):
+    with pytest.raises(BudgetExceeded, match="memory"):
+        list(iter_acceptance_variants(
+            unconstrained_matrix, GenerationBudget(max_memory_bytes=1000)
+        ))
+
+
+def test_expired_deadline_raises_before_first_variant(unconstrained_matrix):
+    variants = iter_acceptance_variants(
+        unconstrained_matrix, GenerationBudget(deadline=time.monotonic() - 1)
+    )
+    with pytest.raises(BudgetExceeded, match="deadline"):
+        next(variants)
+
+
+def test_cancellation_stops_running_generation(unconstrained_matrix):
+    token = CancellationToken()
+    variants = iter_acceptance_variants(
+        unconstrained_matrix, GenerationBudget(cancellation=token)
+    )
+    next(variants)
+    token.cancel()
+    with pytest.raises(BudgetExceeded, match="cancelled"):
+        next(variants)
+
+
+def test_budget_is_enforced_in_worker_processes(unconstrained_matrix):
+    with pytest.raises(BudgetExceeded) as exc_info:
+        generate_optimized_acceptance_variants(
+            unconstrained_matrix, workers=2, budget=GenerationBudget(max_variants=5)
+        )
+    assert exc_info.value.reason == "more than 5 variants"
+
+
+def test_cancellation_stops_parallel_generation(unconstrained_matrix):
+    token = CancellationToken()
+    variants = _iter_parallel_variants(
+        compile_constraints(unconstrained_matrix), 2, GenerationBudget(cancellation=token)
+    )
+    next(variants)
+    token.cancel()
+    with pytest.raises(BudgetExceeded, match="cancelled"):
+        for _ in variants:
+            pass
+
+
+def test_parallel_limit_counts_finished_chunks(unconstrained_matrix):
+    variants = _iter_parallel_variants(
+        compile_constraints(unconstrained_matrix), 2, GenerationBudget(max_variants=30)
+    )
+    yielded = 0
+    with pytest.raises(BudgetExceeded) as exc_info:
+        for _ in variants:
+            yielded += 1
+    assert exc_info.value.variants_generated > 30
+    assert yielded <= 30
+
+
+def test_change_operation_passes_budget_through(unconstrained_matrix):
+    with pytest.raises(BudgetExceeded):
+        delete_activity(unconstrained_matrix, "A", budget=GenerationBudget(max_variants=3))
+
+
+def test_modify_does_not_report_budget_as_contradiction(unconstrained_matrix):
+    modifications = [(
+        "A",
+        "B",
+        TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.INDEPENDENCE, Direction.BOTH),
+    )]
+    with pytest.raises(BudgetExceeded):
+        modify_dependencies(
+            unconstrained_matrix, modifications, budget=GenerationBudget(max_variants=3)
+        )
+
+
+def test_deadline_stops_search_that_finds_no_variants():
+    activities = [f"A{i}" for i in range(26)]
+    matrix = AdjacencyMatrix(activities=activities)
+    # Every subset contains A0 and A1, which have to precede each other
+    for source, target in (("A0", "A1"), ("A1", "A0")):
+        matrix.add_dependency(
+            source,
+            target,
+            TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD),
+            ExistentialDependency(ExistentialType.EQUIVALENCE, Direction.BOTH),
+        )
+    # A0 is forced by A0 OR A2 and A2 => A0
+    matrix.add_dependency(
+        "A0", "A2", None, ExistentialDependency(ExistentialType.OR, Direction.BOTH)
+    )
+    matrix.add_dependency(
+        "A2", "A0", None, ExistentialDependency(ExistentialType.IMPLICATION, Direction.FORWARD)
+    )
+
+    started = time.monotonic()
+    with pytest.raises(BudgetExceeded, match="deadline"):
+        generate_optimized_acceptance_variants(matrix, budget=GenerationBudget.from_limits(timeout=0.5))
+    assert time.monotonic() - started < 5
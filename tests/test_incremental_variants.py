@@ -0,0 +1,84 @@
+import copy
+import pytest
+from adjacency_matrix import AdjacencyMatrix, parse_yaml_to_adjacency_matrix
+from change_operations.modify_operation import modify_dependencies
+from dependencies import (
+    Direction,
+    ExistentialDependency,
+    ExistentialType,
+    TemporalDependency,
+    TemporalType,
+)
+from incremental_variants import changed_dependency_cells, update_acceptance_variants
+from optimized_acceptance_variants import generate_optimized_acceptance_variants
+
+
+def _modified(matrix, cell, dependency):
+    modified = copy.deepcopy(matrix)
+    if dependency is None:
+        del modified.dependencies[cell]
+    else:
+        modified.dependencies[cell] = dependency
+    return modified
+
+
+@pytest.mark.parametrize("cell, dependency", [
+    # Loosening: C and D may now occur together
+    (("C", "D"), None),
+    # Loosening: A no longer has to be directly followed by B
+    (("A", "B"), (
+        TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.IMPLICATION, Direction.FORWARD),
+    )),
+    # Tightening: E has to come before A
+    (("A", "E"), (
+        TemporalDependency(TemporalType.EVENTUAL, Direction.BACKWARD),
+        ExistentialDependency(ExistentialType.INDEPENDENCE, Direction.BOTH),
+    )),
+])
+def test_update_matches_full_generation(cell, dependency):
+    matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    modified = _modified(matrix, cell, dependency)
+
+    updated = update_acceptance_variants(
+        generate_optimized_acceptance_variants(matrix), matrix, modified
+    )
+
+    assert updated == generate_optimized_acceptance_variants(modified)
+
+
+def test_changed_dependency_cells_ignores_equivalent_forms():
+    matrix = AdjacencyMatrix(["a", "b"])
+    matrix.add_dependency("a", "b", None, None)
+    modified = copy.deepcopy(matrix)
+    modified.add_dependency(
+        "a", "b",
+        TemporalDependency(TemporalType.INDEPENDENCE, Direction.BOTH),
+        ExistentialDependency(ExistentialType.INDEPENDENCE, Direction.BOTH),
+    )
+    assert changed_dependency_cells(matrix, modified) == []
+
+    modified.add_dependency("b", "a", TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD), None)
+    assert changed_dependency_cells(matrix, modified) == [("b", "a")]
+
+
+def test_update_rejects_different_activities():
+    with pytest.raises(ValueError):
+        update_acceptance_variants([], AdjacencyMatrix(["a"]), AdjacencyMatrix(["a", "b"]))
+
+
+def test_modify_dependencies_with_previous_variants():
+    matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    modifications = [(
+        "C", "D",
+        TemporalDependency(TemporalType.INDEPENDENCE, Direction.BOTH),
+        ExistentialDependency(ExistentialType.OR, Direction.BOTH),
+    )]
+
+    expected = modify_dependencies(matrix, modifications)
+    incremental = modify_dependencies(
+        matrix, modifications, previous_variants=generate_optimized_acceptance_variants(matrix)
+    )
+
+    assert incremental[0].dependencies == expected[0].dependencies
+    assert incremental[1] == expected[1]
@@ -0,0 +1,215 @@
+import types
+from math import comb, factorial
+import pytest
+from adjacency_matrix import AdjacencyMatrix, parse_yaml_to_adjacency_matrix
+from dependencies import (
+    TemporalType,
+    ExistentialType,
+    TemporalDependency,
+    ExistentialDependency,
+    Direction,
+)
+from acceptance_variants import generate_acceptance_variants, satisfies_temporal_constraints
+from utils.split_dependencies import split_dependencies
+from compiled_constraints import compile_constraints
+from optimized_acceptance_variants import (
+    PARALLEL_CHUNKS_PER_WORKER,
+    _pack_tasks,
+    _parallel_tasks,
+    generate_optimized_acceptance_variants,
+    iter_acceptance_variants,
+    count_acceptance_variants,
+    sample_acceptance_variants,
+)
+
+
+@pytest.fixture
+def sample_adj_matrix():
+    matrix = AdjacencyMatrix(activities=["A", "B", "C", "D"])
+    matrix.add_dependency(
+        "A",
+        "B",
+        TemporalDependency(TemporalType.DIRECT, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.IMPLICATION, Direction.FORWARD),
+    )
+    matrix.add_dependency(
+        "B",
+        "C",
+        TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.EQUIVALENCE, Direction.BOTH),
+    )
+    matrix.add_dependency(
+        "C",
+        "D",
+        TemporalDependency(TemporalType.EVENTUAL, Direction.BACKWARD),
+        ExistentialDependency(ExistentialType.OR, Direction.BOTH),
+    )
+    return matrix
+
+
+def _as_set(variants):
+    return {tuple(variant) for variant in variants}
+
+
+def test_iter_acceptance_variants_is_lazy(sample_adj_matrix):
+    variants = iter_acceptance_variants(sample_adj_matrix)
+
+    assert isinstance(variants, types.GeneratorType)
+    assert next(variants) is not None
+
+
+def test_iter_matches_generate(sample_adj_matrix):
+    assert list(iter_acceptance_variants(sample_adj_matrix)) == (
+        generate_optimized_acceptance_variants(sample_adj_matrix)
+    )
+
+
+def test_generate_matches_reference_implementation(sample_adj_matrix):
+    optimized = _as_set(generate_optimized_acceptance_variants(sample_adj_matrix))
+    reference = _as_set(generate_acceptance_variants(sample_adj_matrix))
+
+    # The reference implementation never emits the empty variant
+    assert optimized - {()} == reference
+
+
+def test_generate_from_yaml_first_prototype():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+
+    optimized = _as_set(generate_optimized_acceptance_variants(adj_matrix))
+    reference = _as_set(generate_acceptance_variants(adj_matrix))
+
+    assert optimized - {()} == reference
+
+
+def test_direct_both_direction_behaves_like_forward():
+    adj = AdjacencyMatrix(activities=["A", "B", "C", "D"])
+    adj.add_dependency(
+        "A", "B", TemporalDependency(TemporalType.DIRECT, Direction.BOTH), None
+    )
+    variants = _as_set(generate_optimized_acceptance_variants(adj))
+
+    assert ("C", "A", "B", "D") in variants
+    assert ("B", "A", "C", "D") not in variants
+    assert variants - {()} == _as_set(generate_acceptance_variants(adj))
+
+
+def test_every_emitted_variant_satisfies_temporal_constraints():
+    adj = AdjacencyMatrix(activities=["A", "B", "C", "D", "E"])
+    adj.add_dependency(
+        "A", "B", TemporalDependency(TemporalType.EVENTUAL, Direction.FORWARD), None
+    )
+    adj.add_dependency(
+        "C", "B", TemporalDependency(TemporalType.DIRECT, Direction.BACKWARD), None
+    )
+    adj.add_dependency(
+        "E", "D", TemporalDependency(TemporalType.EVENTUAL, Direction.BACKWARD), None
+    )
+    adj.add_dependency(
+        "D", "A", TemporalDependency(TemporalType.DIRECT, Direction.FORWARD), None
+    )
+    temporal_deps, _ = split_dependencies(adj.get_dependencies())
+
+    variants = list(iter_acceptance_variants(adj))
+
+    assert all(satisfies_temporal_constraints(v, temporal_deps) for v in variants)
+    assert _as_set(variants) - {()} == _as_set(generate_acceptance_variants(adj))
+
+
+def test_parallel_generation_matches_sequential_order(sample_adj_matrix):
+    sequential = generate_optimized_acceptance_variants(sample_adj_matrix)
+
+    assert generate_optimized_acceptance_variants(sample_adj_matrix, workers=2) == sequential
+
+
+def test_parallel_generation_splits_large_subsets_in_order():
+    adj = AdjacencyMatrix(activities=["A", "B", "C", "D", "E"])
+    adj.add_dependency(
+        "B", "D", TemporalDependency(TemporalType.DIRECT, Direction.FORWARD), None
+    )
+    sequential = generate_optimized_acceptance_variants(adj)
+    tasks = _parallel_tasks(compile_constraints(adj), 2 * PARALLEL_CHUNKS_PER_WORKER, None)
+
+    assert any(first_chain is not None for _, first_chain, _ in tasks)
+    assert sum(cost for _, _, cost in tasks) == len(sequential)
+    assert generate_optimized_acceptance_variants(adj, workers=2) == sequential
+
+
+def test_parallel_chunks_have_balanced_cost():
+    tasks = _parallel_tasks(compile_constraints(AdjacencyMatrix(activities=list("ABCDEFGH"))), 16, None)
+    costs = [cost for _, _, cost in tasks]
+    loads = [sum(costs[position] for position in chunk) for chunk in _pack_tasks(costs, 16)]
+
+    assert len(loads) == 16
+    assert max(loads) < 1.5 * sum(costs) / 16
+
+
+def test_count_matches_enumeration(sample_adj_matrix):
+    assert count_acceptance_variants(sample_adj_matrix) == len(
+        generate_optimized_acceptance_variants(sample_adj_matrix)
+    )
+
+
+def test_count_from_yaml_first_prototype():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+
+    assert count_acceptance_variants(adj_matrix) == len(
+        generate_optimized_acceptance_variants(adj_matrix)
+    )
+
+
+def test_count_unconstrained_exceeds_enumeration_limits():
+    activities = [f"A{i}" for i in range(14)]
+    adj = AdjacencyMatrix(activities=activities)
+
+    # every ordering of every subset, including the empty variant
+    expected = sum(comb(14, k) * factorial(k) for k in range(15))
+    assert count_acceptance_variants(adj) == expected
+
+
+def test_count_contradiction_is_zero():
+    adj = AdjacencyMatrix(activities=["A", "B"])
+    adj.add_dependency(
+        "A",
+        "B",
+        TemporalDependency(TemporalType.DIRECT, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.EQUIVALENCE, Direction.BOTH),
+    )
+    adj.add_dependency(
+        "B",
+        "A",
+        TemporalDependency(TemporalType.DIRECT, Direction.FORWARD),
+        ExistentialDependency(ExistentialType.OR, Direction.BOTH),
+    )
+    assert count_acceptance_variants(adj) == 0
+
+
+def test_samples_are_valid_and_reproducible(sample_adj_matrix):
+    variants = _as_set(generate_optimized_acceptance_variants(sample_adj_matrix))
+    samples = sample_acceptance_variants(sample_adj_matrix, 200, seed=7)
+
+    assert len(samples) == 200
+    assert _as_set(samples) <= variants
+    assert samples == sample_acceptance_variants(sample_adj_matrix, 200, seed=7)
+
+
+def test_samples_are_uniform():
+    adj = AdjacencyMatrix(activities=["A", "B", "C"])
+    adj.add_dependency(
+        "A", "B", TemporalDependency(TemporalType.DIRECT, Direction.FORWARD), None
+    )
+    variants = _as_set(generate_optimized_acceptance_variants(adj))
+    samples = sample_acceptance_variants(adj, 200 * len(variants), seed=1)
+
+    frequencies = {variant: 0 for variant in variants}
+    for sample in samples:
+        frequencies[tuple(sample)] += 1
+    assert all(100 < frequency < 300 for frequency in frequencies.values())
+
+
+def test_sampling_contradiction_raises():
+    adj = AdjacencyMatrix(activities=["A"])
+    adj.add_dependency(
+        "A", "A", None, ExistentialDependency(ExistentialType.NEGATED_EQUIVALENCE, Direction.BOTH)
+    )
+    with pytest.raises(ValueError):
+        sample_acceptance_variants(adj, 1)
@@ -0,0 +1,119 @@
+import os
+import pytest
+from adjacency_matrix import parse_yaml_to_adjacency_matrix
+from compiled_constraints import compile_constraints
+import optimized_acceptance_variants
+from optimized_acceptance_variants import build_variant_set, iter_acceptance_variants, variant_cache_key
+from variant_cache import VariantCache, get_default_cache, set_default_cache
+from variant_set import VariantSet
+
+
+@pytest.fixture
+def default_cache(tmp_path):
+    previous = get_default_cache()
+    cache = VariantCache(str(tmp_path / "cache"))
+    set_default_cache(cache)
+    yield cache
+    set_default_cache(previous)
+
+
+def test_cache_roundtrip_and_miss(tmp_path):
+    cache = VariantCache(str(tmp_path))
+    variants = VariantSet.from_variants([["A", "B"], ["B"]])
+
+    assert cache.get("abc") is None
+    cache.put("abc", variants)
+    assert list(cache.get("abc")) == [["A", "B"], ["B"]]
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    cache = VariantCache(str(tmp_path))
+    cache.put("abc", VariantSet.from_variants([["A"]]))
+    with open(tmp_path / "abc.variants", "wb") as file:
+        file.write(b"garbage")
+
+    assert cache.get("abc") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    variants = VariantSet.from_variants([["A", "B", "C"]] * 10)
+    entry_size = len(variants.to_bytes())
+    cache = VariantCache(str(tmp_path), max_bytes=2 * entry_size)
+
+    cache.put("first", variants)
+    cache.put("second", variants)
+    os.utime(tmp_path / "first.variants", (0, 0))
+    os.utime(tmp_path / "second.variants", (1, 1))
+    cache.get("first")
+    cache.put("third", variants)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_engine_fills_and_reuses_default_cache(default_cache, monkeypatch):
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    key = variant_cache_key(compile_constraints(adj_matrix))
+    variants = list(iter_acceptance_variants(adj_matrix))
+
+    assert list(default_cache.get(key)) == variants
+
+    def fail(*args):
+        raise AssertionError("cache hit should not search")
+
+    monkeypatch.setattr("optimized_acceptance_variants.iter_compiled_orderings", fail)
+    assert list(iter_acceptance_variants(adj_matrix)) == variants
+    assert list(build_variant_set(adj_matrix)) == variants
+
+
+def test_partially_consumed_stream_is_not_cached(default_cache):
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    next(iter_acceptance_variants(adj_matrix))
+
+    assert default_cache.get(variant_cache_key(compile_constraints(adj_matrix))) is None
+
+
+def test_entry_above_size_cap_is_not_recorded(tmp_path, monkeypatch):
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    variants = list(iter_acceptance_variants(adj_matrix))
+    cache = VariantCache(str(tmp_path), max_bytes=100)
+    set_default_cache(cache)
+
+    appended = []
+    append_indices = VariantSet.append_indices
+    monkeypatch.setattr(
+        VariantSet,
+        "append_indices",
+        lambda self, indices: appended.append(indices) or append_indices(self, indices),
+    )
+
+    assert list(iter_acceptance_variants(adj_matrix)) == variants
+    assert cache.get(variant_cache_key(compile_constraints(adj_matrix))) is None
+    assert len(appended) < len(variants)
+
+
+def test_engine_version_is_part_of_the_key(default_cache, monkeypatch):
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    list(iter_acceptance_variants(adj_matrix))
+    key = variant_cache_key(compile_constraints(adj_matrix))
+
+    monkeypatch.setattr(optimized_acceptance_variants, "ENGINE_VERSION", optimized_acceptance_variants.ENGINE_VERSION + 1)
+
+    assert variant_cache_key(compile_constraints(adj_matrix)) != key
+    assert default_cache.get(variant_cache_key(compile_constraints(adj_matrix))) is None
+
+
+def test_unwritable_directory_does_not_fail(tmp_path, monkeypatch):
+    cache = VariantCache(str(tmp_path))
+    cache.put("abc", VariantSet.from_variants([["A"]]))
+
+    def deny(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(os, "utime", deny)
+    monkeypatch.setattr("tempfile.mkstemp", deny)
+
+    assert list(cache.get("abc")) == [["A"]]
+    cache.put("def", VariantSet.from_variants([["B"]]))
+    assert cache.get("def") is None
@@ -0,0 +1,75 @@
+import gc
+import json
+import pytest
+from adjacency_matrix import AdjacencyMatrix, parse_yaml_to_adjacency_matrix
+from generation_budget import BudgetExceeded, GenerationBudget
+from optimized_acceptance_variants import generate_optimized_acceptance_variants
+
+
+@pytest.fixture
+def adj_matrix():
+    return parse_yaml_to_adjacency_matrix("sample-matrices/fixed_evaluation_matrix.yaml")
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_checkpointed_generation_matches_plain_generation(adj_matrix, tmp_path):
+    path = tmp_path / "variants.ckpt"
+    variants = generate_optimized_acceptance_variants(
+        adj_matrix, checkpoint_path=str(path), checkpoint_every=5
+    )
+
+    assert variants == generate_optimized_acceptance_variants(adj_matrix)
+    records = _records(path)
+    assert records[0]["type"] == "header"
+    assert records[-1] == {"type": "complete"}
+    assert sum(len(record.get("variants", [])) for record in records) == len(variants)
+
+
+def test_resume_continues_after_interruption(adj_matrix, tmp_path):
+    path = str(tmp_path / "variants.ckpt")
+    with pytest.raises(BudgetExceeded):
+        generate_optimized_acceptance_variants(
+            adj_matrix, checkpoint_path=path, checkpoint_every=3,
+            budget=GenerationBudget(max_variants=10),
+        )
+    # Simulate a crash in the middle of writing a record
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"type": "variants", "size": 9')
+
+    resumed = generate_optimized_acceptance_variants(adj_matrix, checkpoint_path=path, resume=True)
+
+    assert resumed == generate_optimized_acceptance_variants(adj_matrix)
+    assert generate_optimized_acceptance_variants(
+        adj_matrix, checkpoint_path=path, resume=True
+    ) == resumed
+
+
+def test_resume_rejects_checkpoint_of_other_matrix(adj_matrix, tmp_path):
+    path = str(tmp_path / "variants.ckpt")
+    generate_optimized_acceptance_variants(adj_matrix, checkpoint_path=path)
+
+    with pytest.raises(ValueError, match="different matrix"):
+        generate_optimized_acceptance_variants(
+            AdjacencyMatrix(activities=["A", "B"]), checkpoint_path=path, resume=True
+        )
+
+
+def test_interrupted_run_flushes_before_the_exception_is_released(adj_matrix, tmp_path):
+    path = str(tmp_path / "variants.ckpt")
+    with pytest.raises(BudgetExceeded) as interrupted:
+        generate_optimized_acceptance_variants(
+            adj_matrix, checkpoint_path=path, checkpoint_every=3,
+            budget=GenerationBudget(max_variants=10),
+        )
+    # The exception is still referenced while the run is resumed
+    resumed = generate_optimized_acceptance_variants(adj_matrix, checkpoint_path=path, resume=True)
+    del interrupted
+    gc.collect()
+
+    assert generate_optimized_acceptance_variants(
+        adj_matrix, checkpoint_path=path, resume=True
+    ) == resumed == generate_optimized_acceptance_variants(adj_matrix)
@@ -0,0 +1,60 @@
+import pytest
+from adjacency_matrix import parse_yaml_to_adjacency_matrix
+from optimized_acceptance_variants import build_variant_set, generate_optimized_acceptance_variants
+from variants_to_matrix import variants_to_matrix
+from variant_set import VariantSet
+
+
+def test_variant_set_indexing_and_slicing():
+    variants = [["A", "B"], [], ["C"], ["B", "A", "C"]]
+    variant_set = VariantSet.from_variants(variants)
+
+    assert len(variant_set) == 4
+    assert variant_set.activities == ["A", "B", "C"]
+    assert variant_set[0] == ["A", "B"]
+    assert variant_set[1] == []
+    assert variant_set[-1] == ["B", "A", "C"]
+    assert list(variant_set) == variants
+    assert list(variant_set[1:3]) == variants[1:3]
+    assert list(variant_set[::2]) == variants[::2]
+    assert len(variant_set[3:1]) == 0
+    with pytest.raises(IndexError):
+        variant_set[4]
+
+
+def test_variant_set_deduplicated_keeps_first_occurrence():
+    variant_set = VariantSet.from_variants(
+        [["B"], ["A", "B"], ["B"], [], ["A", "B"], []], activities=["A", "B"]
+    )
+    assert list(variant_set.deduplicated()) == [["B"], ["A", "B"], []]
+
+
+def test_variant_set_grows_past_byte_indices():
+    activities = [f"A{i}" for i in range(300)]
+    variant_set = VariantSet.from_variants([activities[:10], activities])
+
+    assert variant_set[0] == activities[:10]
+    assert variant_set[1] == activities
+    assert variant_set.variant_indices(1)[-1] == 299
+
+
+def test_build_variant_set_matches_generated_variants():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    variants = generate_optimized_acceptance_variants(adj_matrix)
+    variant_set = build_variant_set(adj_matrix)
+
+    assert list(variant_set) == variants
+    assert variants_to_matrix(variant_set, adj_matrix.activities).dependencies == (
+        variants_to_matrix(variants, adj_matrix.activities).dependencies
+    )
+
+
+def test_variant_set_bytes_roundtrip():
+    activities = [f"A{i}" for i in range(300)]
+    variant_set = VariantSet.from_variants([["A1", "A0"], [], activities], activities)
+    restored = VariantSet.from_bytes(variant_set.to_bytes())
+
+    assert restored.activities == activities
+    assert list(restored) == list(variant_set)
+    with pytest.raises(ValueError):
+        VariantSet.from_bytes(variant_set.to_bytes()[:-1])
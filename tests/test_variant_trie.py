@@ -0,0 +1,55 @@
+import sys
+from adjacency_matrix import parse_yaml_to_adjacency_matrix
+from optimized_acceptance_variants import build_variant_trie, generate_optimized_acceptance_variants
+from variants_to_matrix import variants_to_matrix
+from variant_trie import VariantTrie
+
+
+def test_trie_stores_variants_once():
+    trie = VariantTrie.from_variants([["A", "B"], ["A"], ["A", "B", "C"], ["A", "B"], ["B"]])
+
+    assert len(trie) == 4
+    assert ["A", "B"] in trie
+    assert ("A", "B", "C") in trie
+    assert ["A", "C"] not in trie
+    assert [] not in trie
+    assert list(trie) == [["A"], ["A", "B"], ["A", "B", "C"], ["B"]]
+
+
+def test_trie_child_counts():
+    trie = VariantTrie.from_variants([["A", "B"], ["A", "C"], ["A", "C", "D"], ["B"]])
+
+    assert trie.child_count() == 2
+    assert trie.child_count(["A"]) == 2
+    assert trie.child_count(["A", "C"]) == 1
+    assert trie.child_count(["A", "B"]) == 0
+    assert trie.child_count(["D"]) == 0
+
+
+def test_build_variant_trie_matches_generated_variants():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    variants = generate_optimized_acceptance_variants(adj_matrix)
+    trie = build_variant_trie(adj_matrix)
+
+    assert len(trie) == len(variants)
+    assert sorted(trie) == sorted(variants)
+    assert all(variant in trie for variant in variants)
+    assert trie.activities == list(adj_matrix.activities)
+
+
+def test_trie_is_smaller_than_variant_lists():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    variants = generate_optimized_acceptance_variants(adj_matrix)
+    trie = build_variant_trie(adj_matrix)
+
+    list_bytes = sum(sys.getsizeof(variant) for variant in variants)
+    assert trie.nbytes < list_bytes
+
+
+def test_variants_to_matrix_accepts_trie():
+    adj_matrix = parse_yaml_to_adjacency_matrix("sample-matrices/first_prototype.yaml")
+    variants = generate_optimized_acceptance_variants(adj_matrix)
+
+    from_trie = variants_to_matrix(build_variant_trie(adj_matrix), adj_matrix.activities)
+    from_list = variants_to_matrix(variants, adj_matrix.activities)
+    assert from_trie.dependencies == from_list.dependencies
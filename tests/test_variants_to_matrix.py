@@ -1,4 +1,12 @@
-from variants_to_matrix import get_existential_relation, get_temporal_relation, variants_to_matrix
+import pytest
+import variants_to_matrix as variants_to_matrix_module
+from variants_to_matrix import (
+    RelationAccumulator,
+    get_existential_relation,
+    get_temporal_relation,
+    variants_to_matrix,
+    vectorized_relations,
+)
 from dependencies import ExistentialType, TemporalType, Direction
 from adjacency_matrix import AdjacencyMatrix
 
@@ -97,4 +105,113 @@ def test_variants_to_matrix_XOR():
     temp_dep, exist_dep = matrix.get_dependency("B", "C")
     assert temp_dep is None
     assert exist_dep.type == ExistentialType.NEGATED_EQUIVALENCE
-    assert exist_dep.direction == Direction.BOTH
\ No newline at end of file
+    assert exist_dep.direction == Direction.BOTH
+
+def test_variants_to_matrix_matches_pairwise_relations():
+    # Repeated activities count at their first occurrence
+    variants = [["A", "B", "A", "C"], ["C", "A"], ["B", "D", "B"], [], ["D"]]
+    activities = ["A", "B", "C", "D"]
+
+    matrix = variants_to_matrix(variants, activities)
+    combinations = set(frozenset(variant) for variant in variants)
+
+    for a in activities:
+        for b in activities:
+            if a == b:
+                continue
+            temporal_type, temporal_direction = get_temporal_relation(a, b, variants)
+            temp_dep, exist_dep = matrix.get_dependency(a, b)
+            assert (exist_dep.type, exist_dep.direction) == get_existential_relation(a, b, combinations)
+            if temporal_type is None:
+                assert temp_dep is None
+            else:
+                assert (temp_dep.type, temp_dep.direction) == (temporal_type, temporal_direction)
+
+def test_vectorized_relations_match_pairwise_relations():
+    pytest.importorskip("numpy")
+    variants = [["A", "B", "A", "C"], ["C", "A"], ["B", "D", "B"], [], ["D"], ["B", "C"]]
+    activities = ["A", "B", "C", "D", "E"]
+
+    relations = vectorized_relations(variants, activities)
+    combinations = set(frozenset(variant) for variant in variants)
+
+    for idx_a, a in enumerate(activities):
+        for idx_b, b in enumerate(activities):
+            if a == b:
+                continue
+            assert relations.existential_relation(idx_a, idx_b) == get_existential_relation(a, b, combinations)
+            assert relations.temporal_relation(idx_a, idx_b) == get_temporal_relation(a, b, variants)
+
+def test_relation_accumulator_streams_variants(monkeypatch):
+    variants = [["A", "B"], ["A"], ["B", "C", "A"], [], ["D", "A"]]
+    expected = variants_to_matrix(variants, ["D", "C", "B", "A"])
+
+    # Fold after every second variant, so later variants introduce new activities
+    monkeypatch.setattr("variants_to_matrix.ACCUMULATOR_CHUNK_VARIANTS", 2)
+    accumulator = RelationAccumulator()
+    for variant in variants:
+        accumulator.update(variant)
+    streamed = accumulator.to_matrix(["D", "C", "B", "A"])
+
+    assert accumulator.activities == ["A", "B", "C", "D"]
+    assert streamed.activities == ["D", "C", "B", "A"]
+    assert streamed.dependencies == expected.dependencies
+    assert variants_to_matrix(iter(variants), ["D", "C", "B", "A"]).dependencies == expected.dependencies
+
+def test_variants_to_matrix_parallel_matches_sequential():
+    variants = [["A", "B", "C"], ["A", "C", "B"], ["C"], [], ["B", "D"], ["D", "D", "A"]]
+
+    sequential = variants_to_matrix(variants, ["A", "B", "C", "D"])
+    parallel = variants_to_matrix(variants, ["A", "B", "C", "D"], workers=2)
+
+    assert parallel.activities == sequential.activities
+    assert parallel.dependencies == sequential.dependencies
+
+def test_variants_to_matrix_parallel_reads_generator_in_bounded_window(monkeypatch):
+    variants = [["A", "B", "C"], ["A", "C", "B"], ["C"], [], ["B", "D"], ["D", "D", "A"]] * 10
+    monkeypatch.setattr(variants_to_matrix_module, "PARALLEL_SHARD_VARIANTS", 2)
+    read = 0
+    read_at_merge = []
+
+    def generate():
+        nonlocal read
+        for variant in variants:
+            read += 1
+            yield variant
+
+    merge = RelationAccumulator.merge
+    monkeypatch.setattr(
+        RelationAccumulator,
+        "merge",
+        lambda self, other: read_at_merge.append(read) or merge(self, other),
+    )
+    parallel = variants_to_matrix(generate(), ["A", "B", "C", "D"], workers=2)
+
+    # 2 workers with 2 shards each in flight, plus the shard read before merging
+    assert all(count <= 2 * (merged + 5) for merged, count in enumerate(read_at_merge))
+    assert parallel.dependencies == variants_to_matrix(variants, ["A", "B", "C", "D"]).dependencies
+
+def test_relation_accumulator_merge_remaps_shards():
+    variants = [["A", "B"], ["C"], ["B", "A", "D"], [], ["D", "C"]]
+    first, second = RelationAccumulator(), RelationAccumulator()
+    first.extend(variants[:2])
+    second.extend(variants[2:])
+    first.merge(second)
+
+    assert first.activities == ["A", "B", "C", "D"]
+    assert first.to_matrix().dependencies == variants_to_matrix(variants).dependencies
+
+def test_relation_accumulator_skips_saturated_variants(monkeypatch):
+    # All orders of all subsets of A and B make both relations independent
+    saturating = [[], ["A"], ["B"], ["A", "B"], ["B", "A"]]
+    variants = saturating + [["B", "A"], ["C", "A"], ["A"]]
+    expected = variants_to_matrix(variants)
+
+    monkeypatch.setattr("variants_to_matrix.ACCUMULATOR_CHUNK_VARIANTS", 1)
+    accumulator = RelationAccumulator()
+    accumulator.extend(saturating)
+    assert accumulator.relations().saturated()
+
+    accumulator.extend(variants[len(saturating):])
+    assert not accumulator.relations().saturated()
+    assert accumulator.to_matrix().dependencies == expected.dependencies
@@ -1,4 +1,4 @@
-from typing import Tuple, Dict, List, Set
+from typing import Tuple, Dict, Collection, List, Set
 from z3 import Solver, Bool, Implies, Xor, Not, And, Or, sat
 from dependencies import (
     TemporalDependency,
@@ -113,7 +113,7 @@ def has_temporal_contradiction(
     existential_deps: Dict[Tuple[str, str], ExistentialDependency],
     activities: List[str],
     activity: str,
-    variants: List[List[str]],
+    variants: Collection[List[str]],
 ):
     """
     Checks if there is a contradiction in the temporal dependencies.
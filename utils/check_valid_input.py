@@ -1,4 +1,4 @@
-from typing import Tuple, Optional, Dict, List
+from typing import Tuple, Optional, Dict, Collection, List
 from utils.check_contradictions import has_temporal_contradiction, has_existential_contradiction
 from utils.split_dependencies import split_dependencies
 from dependencies import (
@@ -10,7 +10,7 @@ def is_valid_input(
     activities,
     new_activities,
     activity: str,
-    variants: List[List[str]],
+    variants: Collection[List[str]],
     total_dependencies: Dict[
         Tuple[str, str],
         Tuple[Optional[TemporalDependency], Optional[ExistentialDependency]],
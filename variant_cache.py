@@ -0,0 +1,114 @@
+import os
+import tempfile
+from typing import Optional
+from variant_set import VariantSet
+
+_SUFFIX = ".variants"
+
+
+class VariantCache:
+    """
+    Content-addressed on-disk cache of acceptance variants.
+
+    Entries are keyed by optimized_acceptance_variants.variant_cache_key, i.e. the
+    fingerprint of the constraints and the engine version, and stored as serialized
+    VariantSets, one file per key. Writes go to a temporary file that is
+    moved into place with os.replace, so concurrent processes only ever see
+    complete entries. Reading an entry refreshes its modification time; once the
+    directory grows beyond max_bytes, the entries with the oldest modification
+    times are removed first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, fingerprint: str) -> Optional[VariantSet]:
+        """
+        Looks up the variants stored for a fingerprint.
+
+        Returns:
+            The cached variants, or None if there is no readable entry
+        """
+        path = self._path(fingerprint)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            variants = VariantSet.from_bytes(data)
+        except ValueError:
+            # Left behind by an incompatible version; the next put replaces it
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # E.g. a read-only or foreign-owned directory; the entry is still valid
+            pass
+        return variants
+
+    def put(self, fingerprint: str, variants: VariantSet) -> None:
+        """
+        Stores the variants for a fingerprint and evicts old entries above the size cap.
+
+        If the directory cannot be written, e.g. because it is read-only, the
+        variants are not stored.
+        """
+        data = variants.to_bytes()
+        if len(data) > self.max_bytes:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self._path(fingerprint))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, fingerprint + _SUFFIX)
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Removed by another process in the meantime
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+_default_cache: Optional[VariantCache] = None
+
+
+def set_default_cache(cache: Optional[VariantCache]) -> None:
+    """Sets the cache used by the variant generation functions; None disables caching."""
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache() -> Optional[VariantCache]:
+    """Returns the cache used by the variant generation functions, if any."""
+    return _default_cache
@@ -0,0 +1,129 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+# Checkpoint files are JSON lines: one header, then one record per flush
+#   {"type": "header", "version": 1, "fingerprint": "<CompiledConstraints.fingerprint()>"}
+#   {"type": "variants", "size": 3, "cursor": 17, "variants": [[0, 2, 1], ...]}
+#   {"type": "complete"}
+# A variants record holds the orderings (as activity indices) of the subsets processed
+# since the previous record; size and cursor locate the next subset still to process.
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class CheckpointState:
+    """
+    Progress restored from a checkpoint file.
+
+    - size, cursor: the next subset to process is the cursor-th subset (0-based) of
+      that size yielded by existential_subsets.iter_subsets_by_size
+    - orderings: all orderings recorded so far, in emission order
+    - complete: True if the enumeration finished
+    """
+
+    size: int = 0
+    cursor: int = 0
+    orderings: List[List[int]] = field(default_factory=list)
+    complete: bool = False
+
+
+def load_checkpoint(path: str, fingerprint: str) -> Optional[CheckpointState]:
+    """
+    Reads the progress stored in a checkpoint file.
+
+    A last line that was only partially written before a crash is ignored.
+
+    Args:
+        path: The checkpoint file
+        fingerprint: Fingerprint of the constraints being enumerated
+
+    Returns:
+        The restored progress, or None if the file does not exist or is empty
+
+    Raises:
+        ValueError: If the file belongs to a different matrix or is not a checkpoint
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    if not lines:
+        return None
+
+    records = []
+    for line_number, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if line_number == len(lines) - 1:
+                break
+            raise ValueError(f"Checkpoint {path} is corrupted at line {line_number + 1}")
+
+    header = records[0] if records else {}
+    if header.get("type") != "header" or header.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a variant checkpoint")
+    if header.get("fingerprint") != fingerprint:
+        raise ValueError(f"Checkpoint {path} was written for a different matrix")
+
+    state = CheckpointState()
+    for record in records[1:]:
+        if record["type"] == "variants":
+            state.orderings.extend(record["variants"])
+            state.size = record["size"]
+            state.cursor = record["cursor"]
+        elif record["type"] == "complete":
+            state.complete = True
+    return state
+
+
+class CheckpointWriter:
+    """
+    Appends checkpoint records to a file, flushing and syncing every record.
+    """
+
+    def __init__(self, path: str, fingerprint: str, append: bool = False):
+        # A partially written last line is cut off before new records follow it
+        if append:
+            _truncate_partial_line(path)
+        # Append mode writes every record at the current end of the file, so a writer
+        # that is still open elsewhere can never overwrite records in the middle
+        self._file = open(path, "a", encoding="utf-8")
+        if not append:
+            self._file.truncate(0)
+            self._write({"type": "header", "version": CHECKPOINT_VERSION, "fingerprint": fingerprint})
+
+    def record(self, size: int, cursor: int, orderings: Sequence[Sequence[int]]) -> None:
+        """Records the orderings of the subsets before position (size, cursor)."""
+        self._write({
+            "type": "variants",
+            "size": size,
+            "cursor": cursor,
+            "variants": [list(ordering) for ordering in orderings],
+        })
+
+    def complete(self) -> None:
+        """Marks the enumeration as finished."""
+        self._write({"type": "complete"})
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __enter__(self) -> "CheckpointWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _truncate_partial_line(path: str) -> None:
+    with open(path, "rb+") as file:
+        content = file.read()
+        if content and not content.endswith(b"\n"):
+            file.truncate(content.rfind(b"\n") + 1)
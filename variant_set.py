@@ -0,0 +1,182 @@
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+
+class VariantSet:
+    """
+    Compact, integer-encoded storage for a sequence of acceptance variants.
+
+    All variants are concatenated into one flat buffer of activity indices;
+    variant i occupies indices[offsets[i]:offsets[i + 1]]. The activity names are
+    kept once in `activities` for decoding. A VariantSet behaves like a read-only
+    list of variants: it has O(1) length and indexing, slicing returns a new
+    VariantSet, and iterating yields each variant as a list of activity names.
+    """
+
+    def __init__(self, activities: Sequence[str] = ()):
+        self.activities: List[str] = list(activities)
+        self._activity_to_idx: Dict[str, int] = {
+            activity: idx for idx, activity in enumerate(self.activities)
+        }
+        self._indices = array(_typecode(len(self.activities)))
+        self._offsets = array("Q", [0])
+
+    @classmethod
+    def from_variants(
+        cls, variants: Iterable[Sequence[str]], activities: Optional[Sequence[str]] = None
+    ) -> "VariantSet":
+        """
+        Encodes variants given as sequences of activity names.
+
+        Args:
+            variants: The variants to encode
+            activities: Known activities in index order. Activities missing from it
+                are appended in the order they first occur.
+        """
+        variant_set = cls(activities or ())
+        for variant in variants:
+            variant_set.append(variant)
+        return variant_set
+
+    def append(self, variant: Sequence[str]) -> None:
+        """Appends a variant given as a sequence of activity names."""
+        indices = []
+        for activity in variant:
+            idx = self._activity_to_idx.get(activity)
+            if idx is None:
+                idx = self._add_activity(activity)
+            indices.append(idx)
+        self.append_indices(indices)
+
+    def append_indices(self, indices: Iterable[int]) -> None:
+        """Appends a variant given as indices into `activities`."""
+        self._indices.extend(indices)
+        self._offsets.append(len(self._indices))
+
+    def variant_indices(self, position: int) -> array:
+        """Returns the activity indices of the variant at the given position."""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("VariantSet index out of range")
+        return self._indices[self._offsets[position]:self._offsets[position + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the offset and index buffers, the bulk of the to_bytes encoding."""
+        return len(self._offsets) * self._offsets.itemsize + len(self._indices) * self._indices.itemsize
+
+    def deduplicated(self) -> "VariantSet":
+        """
+        Returns the variants without duplicates, keeping the first occurrence of each.
+
+        Duplicates are found by sorting the encoded variants instead of hashing them.
+        """
+        positions = sorted(range(len(self)), key=lambda position: (self._key(position), position))
+        keep = []
+        previous = None
+        for position in positions:
+            key = self._key(position)
+            if key != previous:
+                keep.append(position)
+                previous = key
+        keep.sort()
+
+        result = VariantSet(self.activities)
+        for position in keep:
+            result.append_indices(self.variant_indices(position))
+        return result
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the variants into a compact binary encoding.
+
+        The layout is a fixed header, the activity names as UTF-8 JSON, then the
+        offsets and index buffers as they are held in memory, in little-endian order.
+        """
+        names = json.dumps(self.activities).encode("utf-8")
+        offsets, indices = self._offsets, self._indices
+        if sys.byteorder == "big":
+            offsets, indices = array(offsets.typecode, offsets), array(indices.typecode, indices)
+            offsets.byteswap()
+            indices.byteswap()
+        header = _HEADER.pack(_MAGIC, indices.itemsize, len(names), len(self), len(indices))
+        return header + names + offsets.tobytes() + indices.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "VariantSet":
+        """
+        Restores variants serialized with to_bytes.
+
+        Raises:
+            ValueError: If the data is not a serialized VariantSet
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Data is too short for a serialized VariantSet")
+        magic, itemsize, names_length, variant_count, index_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or itemsize not in (1, 2):
+            raise ValueError("Data is not a serialized VariantSet")
+        offsets_start = _HEADER.size + names_length
+        indices_start = offsets_start + 8 * (variant_count + 1)
+        if len(data) != indices_start + itemsize * index_count:
+            raise ValueError("Serialized VariantSet is truncated")
+
+        variant_set = cls(json.loads(data[_HEADER.size:offsets_start].decode("utf-8")))
+        variant_set._offsets = array("Q", data[offsets_start:indices_start])
+        variant_set._indices = array("B" if itemsize == 1 else "H", data[indices_start:])
+        if sys.byteorder == "big":
+            variant_set._offsets.byteswap()
+            variant_set._indices.byteswap()
+        return variant_set
+
+    def _key(self, position: int) -> bytes:
+        return self.variant_indices(position).tobytes()
+
+    def _add_activity(self, activity: str) -> int:
+        idx = len(self.activities)
+        self.activities.append(activity)
+        self._activity_to_idx[activity] = idx
+        if _typecode(idx + 1) != self._indices.typecode:
+            self._indices = array(_typecode(idx + 1), self._indices)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[List[str], "VariantSet"]:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            result = VariantSet(self.activities)
+            if step == 1 and start < stop:
+                base = self._offsets[start]
+                result._indices = self._indices[base:self._offsets[stop]]
+                result._offsets = array("Q", (offset - base for offset in self._offsets[start:stop + 1]))
+            else:
+                for position in range(start, stop, step):
+                    result.append_indices(self.variant_indices(position))
+            return result
+        activities = self.activities
+        return [activities[idx] for idx in self.variant_indices(item)]
+
+    def __iter__(self) -> Iterator[List[str]]:
+        activities = self.activities
+        indices = self._indices
+        offsets = self._offsets
+        for position in range(len(self)):
+            yield [activities[idx] for idx in indices[offsets[position]:offsets[position + 1]]]
+
+    def __repr__(self) -> str:
+        return f"VariantSet({len(self)} variants over {len(self.activities)} activities)"
+
+
+# magic, bytes per activity index, length of the activity names, variant count, index count
+_HEADER = struct.Struct("<4sBQQQ")
+_MAGIC = b"AVS1"
+
+
+def _typecode(activity_count: int) -> str:
+    """The smallest array typecode that can index the given number of activities."""
+    return "B" if activity_count <= 0x100 else "H"
@@ -0,0 +1,174 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+class VariantTrie:
+    """
+    Stores acceptance variants as paths in a prefix tree.
+
+    Variants produced by the backtracking search share long prefixes; each shared
+    prefix is stored once. The trie is a re-iterable collection of variants and can
+    be passed wherever variants are only iterated or tested for membership, e.g.
+    variants_to_matrix. Duplicates are stored once. Iteration is in depth-first
+    order: a variant comes before its extensions, and siblings follow the order in
+    which they were added.
+
+    The nodes are kept in flat buffers instead of objects: per node the first
+    child, the next sibling and the index of its activity in `activities`, plus a
+    terminal flag. Node 0 is the root, i.e. the empty prefix; since it is never a
+    child, 0 also marks a missing child or sibling.
+    """
+
+    def __init__(self, activities: Sequence[str] = ()):
+        self.activities: List[str] = list(activities)
+        self._activity_to_idx: Dict[str, int] = {
+            activity: idx for idx, activity in enumerate(self.activities)
+        }
+        self._first_child = array("I", [0])
+        self._next_sibling = array("I", [0])
+        self._label = array("H", [0])
+        self._terminal = bytearray(1)
+        self._size = 0
+
+    @classmethod
+    def from_variants(
+        cls, variants: Iterable[Sequence[str]], activities: Optional[Sequence[str]] = None
+    ) -> "VariantTrie":
+        """
+        Builds a trie from variants given as sequences of activity names.
+
+        Args:
+            variants: The variants to add
+            activities: Known activities in index order. Activities missing from it
+                are appended in the order they first occur.
+        """
+        trie = cls(activities or ())
+        for variant in variants:
+            trie.add(variant)
+        return trie
+
+    def add(self, variant: Sequence[str]) -> bool:
+        """
+        Adds a variant given as a sequence of activity names.
+
+        Returns:
+            True if the variant was not contained before
+        """
+        indices = []
+        for activity in variant:
+            idx = self._activity_to_idx.get(activity)
+            if idx is None:
+                idx = len(self.activities)
+                self.activities.append(activity)
+                self._activity_to_idx[activity] = idx
+            indices.append(idx)
+        return self.add_indices(indices)
+
+    def add_indices(self, indices: Iterable[int]) -> bool:
+        """
+        Adds a variant given as indices into `activities`.
+
+        Returns:
+            True if the variant was not contained before
+        """
+        node = 0
+        for idx in indices:
+            child = self._first_child[node]
+            if child == 0:
+                child = self._new_node(idx)
+                self._first_child[node] = child
+            else:
+                while self._label[child] != idx:
+                    sibling = self._next_sibling[child]
+                    if sibling == 0:
+                        sibling = self._new_node(idx)
+                        self._next_sibling[child] = sibling
+                    child = sibling
+            node = child
+        if self._terminal[node]:
+            return False
+        self._terminal[node] = 1
+        self._size += 1
+        return True
+
+    def child_count(self, prefix: Sequence[str] = ()) -> int:
+        """
+        Counts the distinct activities that follow a prefix in the stored variants.
+
+        Returns:
+            The number of children of the prefix node, 0 if no variant starts with the prefix
+        """
+        node = self._find(prefix)
+        if node is None:
+            return 0
+        count = 0
+        child = self._first_child[node]
+        while child:
+            count += 1
+            child = self._next_sibling[child]
+        return count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node buffers."""
+        return (
+            len(self._first_child) * self._first_child.itemsize
+            + len(self._next_sibling) * self._next_sibling.itemsize
+            + len(self._label) * self._label.itemsize
+            + len(self._terminal)
+        )
+
+    def _new_node(self, idx: int) -> int:
+        node = len(self._label)
+        self._first_child.append(0)
+        self._next_sibling.append(0)
+        self._label.append(idx)
+        self._terminal.append(0)
+        return node
+
+    def _find(self, prefix: Sequence[str]) -> Optional[int]:
+        node = 0
+        for activity in prefix:
+            idx = self._activity_to_idx.get(activity)
+            if idx is None:
+                return None
+            child = self._first_child[node]
+            while child and self._label[child] != idx:
+                child = self._next_sibling[child]
+            if not child:
+                return None
+            node = child
+        return node
+
+    def __contains__(self, variant: object) -> bool:
+        if isinstance(variant, str) or not isinstance(variant, Sequence):
+            return False
+        node = self._find(variant)
+        return node is not None and self._terminal[node] == 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[List[str]]:
+        activities = self.activities
+        path: List[str] = []
+        # The nodes on the current path below the root
+        stack: List[int] = []
+        if self._terminal[0]:
+            yield []
+        node = self._first_child[0]
+        while True:
+            if node:
+                path.append(activities[self._label[node]])
+                if self._terminal[node]:
+                    yield path.copy()
+                stack.append(node)
+                node = self._first_child[node]
+                continue
+            if not stack:
+                return
+            node = self._next_sibling[stack.pop()]
+            path.pop()
+
+    def __repr__(self) -> str:
+        return f"VariantTrie({len(self)} variants over {len(self.activities)} activities)"
@@ -1,7 +1,28 @@
-from typing import List, Set, Tuple
+import copy
+from collections import deque
+from collections.abc import Sized
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from adjacency_matrix import AdjacencyMatrix
 from dependencies import ExistentialDependency, ExistentialType, TemporalDependency, TemporalType, Direction
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python sweep is used without it
+    np = None
+
+# Number of variants a RelationAccumulator buffers before folding them into its flags
+ACCUMULATOR_CHUNK_VARIANTS = 4096
+# A buffered chunk is folded with NumPy if it holds at least this many variants
+VECTORIZED_MIN_VARIANTS = 512
+# Variants per worker task when the number of variants is not known upfront
+PARALLEL_SHARD_VARIANTS = 65536
+# Shards per worker that are handed to the pool but not merged yet
+PARALLEL_SHARDS_IN_FLIGHT = 2
+# Upper bound for the entries of the variants x activities x activities comparisons of one chunk
+VECTORIZED_CHUNK_CELLS = 1 << 22
+
 def get_existential_relation(a, b, combinations) -> Tuple[ExistentialType, Direction]:
     """
     Finds existential dependency type for dependency from activity a to b
@@ -29,6 +50,23 @@ def get_existential_relation(a, b, combinations) -> Tuple[ExistentialType, Direc
         elif (a not in combination) and (b in combination):
             exists_only_b = True
     
+    return deduce_existential_relation(exists_neither, exists_both, exists_only_a, exists_only_b)
+
+def deduce_existential_relation(
+    exists_neither: bool, exists_both: bool, exists_only_a: bool, exists_only_b: bool
+) -> Tuple[ExistentialType, Direction]:
+    """
+    Deduces the existential dependency from a to b from the combinations of the two activities that occur
+
+    Args:
+        exists_neither: Some variant contains neither a nor b
+        exists_both: Some variant contains both a and b
+        exists_only_a: Some variant contains a but not b
+        exists_only_b: Some variant contains b but not a
+
+    Returns:
+        The existential type for the relation
+    """
     #Deduce dependency type from combinations
     if (not exists_only_a) and (not exists_only_b):
         return (ExistentialType.EQUIVALENCE, Direction.BOTH)
@@ -46,7 +84,7 @@ def get_existential_relation(a, b, combinations) -> Tuple[ExistentialType, Direc
         return (ExistentialType.OR, Direction.BOTH)
     return (ExistentialType.INDEPENDENCE, Direction.BOTH)
 
-def get_temporal_relation(a, b, variants: List[List[str]]) -> Tuple[TemporalType, Direction]:
+def get_temporal_relation(a, b, variants: Iterable[List[str]]) -> Tuple[TemporalType, Direction]:
     """
     Finds temporal dependency type from dependency for activity a to b
 
@@ -80,6 +118,28 @@ def get_temporal_relation(a, b, variants: List[List[str]]) -> Tuple[TemporalType
         if (exists_a_before_b and exists_b_before_a):
             break
 
+    return deduce_temporal_relation(
+        exists_a_before_b, exists_b_before_a, exists_a_not_direct_before_b, exists_b_not_direct_before_a
+    )
+
+def deduce_temporal_relation(
+    exists_a_before_b: bool,
+    exists_b_before_a: bool,
+    exists_a_not_direct_before_b: bool,
+    exists_b_not_direct_before_a: bool,
+) -> Tuple[TemporalType, Direction]:
+    """
+    Deduces the temporal dependency from a to b from the orders of the two activities that occur
+
+    Args:
+        exists_a_before_b: In some variant a occurs before b
+        exists_b_before_a: In some variant b occurs before a
+        exists_a_not_direct_before_b: In some variant a occurs before b, but not directly
+        exists_b_not_direct_before_a: In some variant b occurs before a, but not directly
+
+    Returns:
+        The temporal type for the relation
+    """
     #Deduce relation type from existing relations
     if exists_a_before_b and not exists_b_before_a and not exists_a_not_direct_before_b:
         return (TemporalType.DIRECT, Direction.FORWARD) #a<_d b
@@ -95,43 +155,461 @@ def get_temporal_relation(a, b, variants: List[List[str]]) -> Tuple[TemporalType
         return (TemporalType.INDEPENDENCE, Direction.BOTH)
     return (None, None)
 
-def variants_to_matrix(variants: List[List[str]], original_activities: List[str] = None) -> AdjacencyMatrix:
+def variants_to_matrix(
+    variants: Iterable[List[str]],
+    original_activities: List[str] = None,
+    workers: Optional[int] = None,
+) -> AdjacencyMatrix:
     """
     Converts a list of variants into an AdjacencyMatrix.
+
+    The variants are read once and folded into a RelationAccumulator, so any
+    iterable works, including a generator whose variants never fit in memory.
+
+    Args:
+        variants: The variants to analyse
+        original_activities: Preferred order of the activities in the matrix
+        workers: Number of worker processes. If greater than 1, the variants are split
+            into shards whose flags are collected in parallel and merged. Only
+            PARALLEL_SHARDS_IN_FLIGHT shards per worker are read ahead, so a
+            generator is not held in memory either.
+    """
+    if workers and workers > 1:
+        accumulator = _parallel_accumulator(variants, workers)
+    else:
+        accumulator = RelationAccumulator()
+        accumulator.extend(variants)
+    return accumulator.to_matrix(original_activities)
+
+def _parallel_accumulator(variants: Iterable[List[str]], workers: int) -> "RelationAccumulator":
+    shard_size = PARALLEL_SHARD_VARIANTS
+    if isinstance(variants, Sized):
+        shard_size = max(ACCUMULATOR_CHUNK_VARIANTS, -(-len(variants) // workers))
+    variant_iter = iter(variants)
+    shards = iter(lambda: list(islice(variant_iter, shard_size)), [])
+
+    accumulator = RelationAccumulator()
+    # Shards are merged in input order, so activities keep their first-seen order
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in shards:
+            if len(pending) == PARALLEL_SHARDS_IN_FLIGHT * workers:
+                accumulator.merge(pending.popleft().result())
+            pending.append(executor.submit(_shard_accumulator, shard))
+        while pending:
+            accumulator.merge(pending.popleft().result())
+    return accumulator
+
+def _shard_accumulator(variants: List[List[str]]) -> "RelationAccumulator":
+    """Worker task: the flags of one shard of variants."""
+    accumulator = RelationAccumulator()
+    accumulator.extend(variants)
+    accumulator.relations()
+    return accumulator
+
+class RelationFlags:
+    """
+    Which combinations and orders occur for every pair of activities, as bitmasks.
+
+    Bit b of an entry for activity a (indices into the activity list) is set if:
+    - before[a]: in some variant a occurs before b
+    - not_direct_before[a]: in some variant a occurs before b, but not directly
+    - with_absent[a]: some variant contains a but not b
+    - absent_with_absent[a]: some variant contains neither a nor b
+    - present_with[a]: some variant contains both a and b
+    """
+
+    FIELDS = ("before", "not_direct_before", "with_absent", "absent_with_absent", "present_with")
+
+    def __init__(self, activity_count: int):
+        self.activity_count = activity_count
+        self.before = [0] * activity_count
+        self.not_direct_before = [0] * activity_count
+        self.with_absent = [0] * activity_count
+        self.absent_with_absent = [0] * activity_count
+        self.present_with = [0] * activity_count
+
+    def add_activity(self, variants_seen: bool) -> None:
+        """
+        Adds an activity that was absent from all variants recorded so far.
+
+        Args:
+            variants_seen: Whether any variant was recorded so far
+        """
+        bit = 1 << self.activity_count
+        absent_with_new = bit if variants_seen else 0
+        for other in range(self.activity_count):
+            # Every variant containing the other activity lacked the new one
+            if self.present_with[other] >> other & 1:
+                self.with_absent[other] |= bit
+            # Every variant lacking the other activity lacked the new one as well
+            if self.absent_with_absent[other] >> other & 1:
+                self.absent_with_absent[other] |= bit
+                absent_with_new |= 1 << other
+        self.activity_count += 1
+        self.before.append(0)
+        self.not_direct_before.append(0)
+        self.with_absent.append(0)
+        self.absent_with_absent.append(absent_with_new)
+        self.present_with.append(0)
+
+    def saturated(self) -> bool:
+        """
+        Checks if no further variant can change any flag that decides a relation.
+
+        That is the case once every pair has occurred in both orders (temporal
+        INDEPENDENCE) and in all four combinations (existential INDEPENDENCE), and
+        every activity has occurred in some variant and been missing from another,
+        which is what add_activity needs to know about the variants seen so far.
+        """
+        full = (1 << self.activity_count) - 1
+        for idx in range(self.activity_count):
+            bit = 1 << idx
+            if self.before[idx] | bit != full or self.with_absent[idx] | bit != full:
+                return False
+            if self.present_with[idx] != full or self.absent_with_absent[idx] != full:
+                return False
+        return True
+
+    def occurs(self, idx: int) -> bool:
+        """Checks if activity idx occurs in any recorded variant."""
+        return self.present_with[idx] >> idx & 1 == 1
+
+    def existential_relation(self, idx_a: int, idx_b: int) -> Tuple[ExistentialType, Direction]:
+        """The existential dependency from activity idx_a to idx_b."""
+        bit_b = 1 << idx_b
+        return deduce_existential_relation(
+            self.absent_with_absent[idx_a] & bit_b != 0,
+            self.present_with[idx_a] & bit_b != 0,
+            self.with_absent[idx_a] & bit_b != 0,
+            self.with_absent[idx_b] >> idx_a & 1 == 1,
+        )
+
+    def temporal_relation(self, idx_a: int, idx_b: int) -> Tuple[TemporalType, Direction]:
+        """The temporal dependency from activity idx_a to idx_b."""
+        bit_b = 1 << idx_b
+        return deduce_temporal_relation(
+            self.before[idx_a] & bit_b != 0,
+            self.before[idx_b] >> idx_a & 1 == 1,
+            self.not_direct_before[idx_a] & bit_b != 0,
+            self.not_direct_before[idx_b] >> idx_a & 1 == 1,
+        )
+
+class RelationAccumulator:
+    """
+    Folds variants one at a time into the RelationFlags of all pairs of activities.
+
+    Only the flags are kept, plus a buffer of at most ACCUMULATOR_CHUNK_VARIANTS
+    variants that are folded together, so memory is O(n^2) in the number of
+    activities no matter how many variants are consumed. Activities are indexed
+    in the order they are first seen, after any activities given upfront.
+
+    Once the flags are saturated, i.e. every pair is independent in both respects,
+    further variants are only checked for new activities and not folded anymore.
+    Loosely constrained processes saturate after a small fraction of their variants.
+    """
+
+    def __init__(self, activities: Sequence[str] = ()):
+        self.activities: List[str] = []
+        self._activity_to_idx: Dict[str, int] = {}
+        self._flags = RelationFlags(0)
+        self._buffer: List[Sequence[str]] = []
+        self._folded_variants = 0
+        self._saturated = False
+        for activity in activities:
+            self._add_activity(activity)
+
+    def update(self, variant: Sequence[str]) -> None:
+        """Adds one variant."""
+        self._buffer.append(variant)
+        if len(self._buffer) >= ACCUMULATOR_CHUNK_VARIANTS:
+            self._flush()
+
+    def extend(self, variants: Iterable[Sequence[str]]) -> None:
+        """Adds all variants of an iterable, reading it once."""
+        variants = iter(variants)
+        while True:
+            self._buffer.extend(islice(variants, ACCUMULATOR_CHUNK_VARIANTS - len(self._buffer)))
+            if len(self._buffer) < ACCUMULATOR_CHUNK_VARIANTS:
+                return
+            self._flush()
+
+    def merge(self, other: "RelationAccumulator") -> None:
+        """
+        Adds the variants of another accumulator, e.g. one that processed another shard.
+
+        All flags are ORs over the variants, so merging gives exactly the flags a
+        single accumulator would collect from the variants of both.
+        """
+        self._flush()
+        other_flags = copy.deepcopy(other.relations())
+        other_activities = list(other.activities)
+        for activity in other_activities:
+            if activity not in self._activity_to_idx:
+                self._add_activity(activity)
+        # Activities the other accumulator never saw were absent from all of its variants
+        for activity in self.activities:
+            if activity not in other._activity_to_idx:
+                other_flags.add_activity(other._folded_variants > 0)
+                other_activities.append(activity)
+
+        mapping = [self._activity_to_idx[activity] for activity in other_activities]
+        identity = mapping == list(range(len(mapping)))
+        for name in RelationFlags.FIELDS:
+            masks = getattr(self._flags, name)
+            for other_idx, mask in enumerate(getattr(other_flags, name)):
+                masks[mapping[other_idx]] |= mask if identity else _remap_bits(mask, mapping)
+        self._folded_variants += other._folded_variants
+        self._saturated = self._flags.saturated()
+
+    def relations(self) -> RelationFlags:
+        """The flags of all variants added so far, indexed like `activities`."""
+        self._flush()
+        return self._flags
+
+    def to_matrix(self, original_activities: Optional[List[str]] = None) -> AdjacencyMatrix:
+        """
+        Builds the AdjacencyMatrix of the variants added so far.
+
+        Args:
+            original_activities: Preferred order of the activities. Activities that
+                do not occur in any variant are left out, activities missing from it
+                are appended in the order they were first seen.
+        """
+        flags = self.relations()
+        activities = [activity for idx, activity in enumerate(self.activities) if flags.occurs(idx)]
+
+        if original_activities:
+            original_set = set(original_activities)
+            occurring = set(activities)
+
+            # Items that are in the original order
+            ordered = [a for a in original_activities if a in occurring]
+
+            # Additional items not found in original_activities, keep their relative order
+            extras = [a for a in activities if a not in original_set]
+
+            activities_list = ordered + extras
+        else:
+            activities_list = activities
+        matrix = AdjacencyMatrix(activities_list)
+
+        for activity_a in activities_list:
+            idx_a = self._activity_to_idx[activity_a]
+            for activity_b in activities_list:
+                idx_b = self._activity_to_idx[activity_b]
+                if idx_a == idx_b:
+                    continue
+                existential_type, existential_direction = flags.existential_relation(idx_a, idx_b)
+                temporal_type, temporal_direction = flags.temporal_relation(idx_a, idx_b)
+
+                exist_dep = ExistentialDependency(existential_type, existential_direction)
+                temp_dep = TemporalDependency(temporal_type, temporal_direction) if temporal_type is not None else None
+
+                matrix.add_dependency(activity_a, activity_b, temp_dep, exist_dep)
+
+        return matrix
+
+    def _add_activity(self, activity: str) -> int:
+        idx = len(self.activities)
+        self.activities.append(activity)
+        self._activity_to_idx[activity] = idx
+        self._flags.add_activity(self._folded_variants > 0)
+        return idx
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        activity_to_idx = self._activity_to_idx
+        if set(chain.from_iterable(self._buffer)).difference(activity_to_idx):
+            for activity in chain.from_iterable(self._buffer):
+                if activity not in activity_to_idx:
+                    self._add_activity(activity)
+            self._saturated = False
+
+        if not self._saturated:
+            if np is not None and len(self._buffer) >= VECTORIZED_MIN_VARIANTS:
+                _fold_vectorized(self._flags, self._buffer, activity_to_idx)
+            else:
+                _fold_swept(self._flags, [
+                    [activity_to_idx[activity] for activity in variant] for variant in self._buffer
+                ])
+            self._saturated = self._flags.saturated()
+        self._folded_variants += len(self._buffer)
+        self._buffer = []
+
+def discover_relations(variants: Iterable[List[str]], activities: List[str]) -> RelationFlags:
     """
+    Collects the RelationFlags of all pairs of activities in a single pass over the variants.
 
-    #Get the set of activities
-    activities: Set[str] = set()
+    Args:
+        variants: The variants to analyse
+        activities: All activities occurring in the variants; flags refer to their indices
+
+    Returns:
+        The flags of all pairs
+    """
+    accumulator = RelationAccumulator(activities)
     for variant in variants:
-        activities.update(variant)
+        accumulator.update(variant)
+    return accumulator.relations()
+
+def vectorized_relations(variants: Iterable[List[str]], activities: List[str]) -> RelationFlags:
+    """
+    Collects the RelationFlags of all pairs with NumPy, regardless of the number of variants.
 
-    if original_activities:
-        original_set = set(original_activities)
+    Raises:
+        ValueError: If NumPy is not installed
+    """
+    if np is None:
+        raise ValueError("The vectorized relation backend requires NumPy")
+    activity_to_idx = {activity: idx for idx, activity in enumerate(activities)}
+    flags = RelationFlags(len(activities))
+    variants = iter(variants)
+    while True:
+        chunk = list(islice(variants, ACCUMULATOR_CHUNK_VARIANTS))
+        if not chunk:
+            return flags
+        _fold_vectorized(flags, chunk, activity_to_idx)
+
+def _fold_swept(flags: RelationFlags, variants: List[List[int]]) -> None:
+    """
+    Adds variants given as activity indices to the flags, visiting each variant once.
 
-        # Items that are in the original order
-        ordered = [a for a in original_activities if a in activities]
+    Every variant is walked backwards, and the activities occurring after an
+    activity are added to its flags as one bitmask. The existential flags only
+    depend on which activities a variant contains, so they are added once per
+    distinct combination.
+    """
+    before = flags.before
+    not_direct_before = flags.not_direct_before
+    bits = [1 << idx for idx in range(flags.activity_count)]
+    combinations = set()
 
-        # Additional items not found in original_activities, keep their relative order
-        extras = [a for a in activities if a not in original_set]
+    for indices in variants:
+        if len(set(indices)) != len(indices):
+            combinations.add(_add_repeating_variant(flags, indices))
+            continue
 
-        activities_list = ordered + extras
-    else:
-        activities_list = list(activities)
-    matrix = AdjacencyMatrix(activities_list)
+        # Walk backwards: `later` holds the activities after the current one,
+        # `beyond` those after the activity directly following it
+        later = 0
+        beyond = 0
+        for idx in reversed(indices):
+            before[idx] |= later
+            not_direct_before[idx] |= beyond
+            beyond = later
+            later |= bits[idx]
+        combinations.add(later)
 
-    combinations = set(frozenset(variant) for variant in variants)
+    all_activities = (1 << flags.activity_count) - 1
+    for combination in combinations:
+        absent = all_activities & ~combination
+        for idx in range(flags.activity_count):
+            if combination >> idx & 1:
+                flags.present_with[idx] |= combination
+                flags.with_absent[idx] |= absent
+            else:
+                flags.absent_with_absent[idx] |= absent
+
+def _add_repeating_variant(flags: RelationFlags, indices: List[int]) -> int:
+    """
+    Adds the orders of a variant that contains some activity more than once.
 
-    for activity_a in activities:
-        for activity_b in activities:
-            if activity_a == activity_b:
-                continue
-            existential_type, existential_direction = get_existential_relation(activity_a, activity_b, combinations)
-            temporal_type, temporal_direction = get_temporal_relation(activity_a, activity_b, variants)
+    Only the first occurrence of an activity counts, as with list.index.
 
+    Returns:
+        The activities contained in the variant
+    """
+    first_occurrences = []
+    seen = 0
+    for pos, idx in enumerate(indices):
+        if not seen >> idx & 1:
+            seen |= 1 << idx
+            first_occurrences.append((idx, pos))
 
-            exist_dep = ExistentialDependency(existential_type, existential_direction)
-            temp_dep = TemporalDependency(temporal_type, temporal_direction) if temporal_type is not None else None
+    later = 0
+    next_idx, next_pos = -1, -1
+    for idx, pos in reversed(first_occurrences):
+        flags.before[idx] |= later
+        direct = 1 << next_idx if next_pos == pos + 1 else 0
+        flags.not_direct_before[idx] |= later & ~direct
+        later |= 1 << idx
+        next_idx, next_pos = idx, pos
+    return seen
 
-            matrix.add_dependency(activity_a, activity_b, temp_dep, exist_dep)
-    
-    return matrix
\ No newline at end of file
+def _fold_vectorized(
+    flags: RelationFlags, variants: List[Sequence[str]], activity_to_idx: Dict[str, int]
+) -> None:
+    """
+    Adds variants to the flags with NumPy.
+
+    The variants are encoded as a matrix of the position of the first occurrence
+    of every activity, -1 if absent. The existential flags of all pairs are
+    products of the presence matrix with itself, the temporal flags are broadcast
+    comparisons of the position columns reduced over the variants.
+    """
+    n = flags.activity_count
+    chunk_rows = max(1, VECTORIZED_CHUNK_CELLS // max(1, n * n))
+
+    before = np.zeros((n, n), dtype=bool)
+    not_direct_before = np.zeros((n, n), dtype=bool)
+    present_with = np.zeros((n, n), dtype=bool)
+    with_absent = np.zeros((n, n), dtype=bool)
+    absent_with_absent = np.zeros((n, n), dtype=bool)
+
+    for start in range(0, len(variants), chunk_rows):
+        positions = _position_matrix(variants[start:start + chunk_rows], activity_to_idx, n)
+
+        # Counts of rows per pair of columns; float32 is exact for any chunk size used here
+        present = (positions >= 0).astype(np.float32)
+        absent = 1 - present
+        present_with |= present.T @ present > 0
+        with_absent |= present.T @ absent > 0
+        absent_with_absent |= absent.T @ absent > 0
+
+        # An absent source is moved behind every position and an absent target (-1)
+        # lies before every position, so neither needs a separate presence mask
+        source = np.where(positions >= 0, positions, np.iinfo(np.int32).max)[:, :, None]
+        target = positions[:, None, :]
+        before |= (target > source).any(axis=0)
+        not_direct_before |= (target - 1 > source).any(axis=0)
+
+    matrices = (before, not_direct_before, with_absent, absent_with_absent, present_with)
+    for name, matrix in zip(RelationFlags.FIELDS, matrices):
+        masks = getattr(flags, name)
+        for idx, mask in enumerate(_row_bitmasks(matrix)):
+            masks[idx] |= mask
+
+def _position_matrix(
+    variants: List[Sequence[str]], activity_to_idx: Dict[str, int], n: int
+) -> "np.ndarray":
+    """The position of the first occurrence of every activity per variant, -1 if absent."""
+    lengths = np.fromiter(map(len, variants), dtype=np.int64, count=len(variants))
+    total = int(lengths.sum())
+    indices = np.fromiter(
+        map(activity_to_idx.__getitem__, chain.from_iterable(variants)), dtype=np.int64, count=total
+    )
+    rows = np.repeat(np.arange(len(variants), dtype=np.int64), lengths)
+    starts = np.cumsum(lengths) - lengths
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(starts, lengths)
+
+    # The smallest position wins, so repeated activities count at their first occurrence
+    positions = np.full(len(variants) * n, total, dtype=np.int64)
+    np.minimum.at(positions, rows * n + indices, offsets)
+    positions[positions == total] = -1
+    return positions.astype(np.int32).reshape(len(variants), n)
+
+def _remap_bits(mask: int, mapping: List[int]) -> int:
+    """Moves every set bit i of a bitmask to bit mapping[i]."""
+    result = 0
+    while mask:
+        low_bit = mask & -mask
+        result |= 1 << mapping[low_bit.bit_length() - 1]
+        mask ^= low_bit
+    return result
+
+def _row_bitmasks(matrix: "np.ndarray") -> List[int]:
+    """Turns each row of a boolean matrix into an integer bitmask, column i at bit i."""
+    packed = np.packbits(matrix, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]